@@ -0,0 +1,146 @@
+import math
+from bisect import bisect_right
+
+from ConvexHullSolver import ConvexHullSolver
+from Hull import Hull
+from predicates import orient, orient_array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ε-hulls for quick previews of large point sets, after Bentley, Faust and
+# Preparata. The x range is cut into k vertical strips of width at most ε, and
+# only the highest and lowest point of every strip (plus the highest and lowest
+# of the points at the smallest and largest x) are kept. The hull of those at
+# most 2k + 4 candidates is built by the exact solver in O(k log k), after an
+# O(n) pass over the points. Its vertices are input points, so it lies inside
+# the exact hull, and every input point is within one strip width of it, which
+# bounds the Hausdorff distance between the two by ε.
+#
+# refine() then gives the exact hull: points strictly inside the approximate
+# hull cannot be vertices, so only the thin band between the two hulls has to
+# be solved exactly.
+
+
+class ApproximateHullSolver:
+
+    def __init__(self, epsilon, solver=None):
+        if not epsilon > 0:
+            raise Exception('Approximate hull tolerance must be positive, got {}'.format(epsilon))
+        self.epsilon = epsilon
+        self.solver = solver or ConvexHullSolver()
+
+    # O(n): indices of the candidate points and the strip width. With as many strips
+    # as points there is nothing to gain, and every point is a candidate (width 0).
+    # Points all on one vertical line have no strips to cut; their hull is the segment
+    # between the lowest and highest of them, which is exact (width 0).
+    def candidates(self, xs, ys):  # returns indices, width
+        n = len(xs)
+        if n == 0:
+            return [], 0.0
+        if np is not None:
+            xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+            low, high = xs.min(), xs.max()
+            if high == low:
+                return sorted({int(ys.argmin()), int(ys.argmax())}), 0.0
+        else:
+            low, high = min(xs), max(xs)
+            if high == low:
+                ends = range(n)
+                return sorted({min(ends, key=ys.__getitem__), max(ends, key=ys.__getitem__)}), 0.0
+        strips = max(1, math.ceil((high - low) / self.epsilon))
+        if strips >= n:
+            return list(range(n)), 0.0
+        width = (high - low) / strips
+
+        if np is not None:
+            return self.candidates_vectorized(xs, ys, low, high, strips, width), width
+
+        tops, bottoms = [None] * strips, [None] * strips
+        lefts, rights = [], []
+        for i in range(n):
+            x, y = xs[i], ys[i]
+            strip = min(int((x - low) / width), strips - 1)
+            if tops[strip] is None or y > ys[tops[strip]]:
+                tops[strip] = i
+            if bottoms[strip] is None or y < ys[bottoms[strip]]:
+                bottoms[strip] = i
+            if x == low:
+                lefts.append(i)
+            if x == high:
+                rights.append(i)
+        ends = [min(lefts, key=ys.__getitem__), max(lefts, key=ys.__getitem__),
+                min(rights, key=ys.__getitem__), max(rights, key=ys.__getitem__)]
+        return sorted(set(i for i in tops + bottoms + ends if i is not None)), width
+
+    # O(n) kernels of candidates
+    def candidates_vectorized(self, xs, ys, low, high, strips, width):
+        strip = np.minimum(((xs - low) / width).astype(np.int64), strips - 1)
+        tops, bottoms = np.full(strips, -np.inf), np.full(strips, np.inf)
+        np.maximum.at(tops, strip, ys)
+        np.minimum.at(bottoms, strip, ys)
+
+        chosen = [np.flatnonzero(ys == tops[strip]), np.flatnonzero(ys == bottoms[strip])]
+        for x in (low, high):
+            at = np.flatnonzero(xs == x)
+            chosen.append(at[[np.argmin(ys[at]), np.argmax(ys[at])]])
+        return np.unique(np.concatenate(chosen)).tolist()
+
+    # O(n + k log k): returns the approximate hull and its error bound, the strip width
+    def approximate(self, xs, ys):  # returns hull, bound
+        candidates, width = self.candidates(xs, ys)
+        return self.solve(xs, ys, candidates), width
+
+    # O(m log m): exact hull of the m points at indices, as a hull over all of xs, ys
+    def solve(self, xs, ys, indices):
+        if getattr(self.solver, 'vectorized', False) and np is not None:
+            hull = self.solver.compute_hull(np.asarray(xs)[indices], np.asarray(ys)[indices])
+        else:
+            hull = self.solver.compute_hull([xs[i] for i in indices], [ys[i] for i in indices])
+        return Hull(xs, ys, [indices[i] for i in hull.getVertices()], hull.right_most_index)
+
+    # O(n log k) + exact solve of the band: the exact hull of xs, ys given an approximate one
+    def refine(self, xs, ys, hull):
+        return self.solve(xs, ys, self.outside(xs, ys, hull))
+
+    # O(n log k): indices of the points not certainly strictly inside hull. Both chains are
+    # x-monotone, so a binary search finds the edge above and below each point.
+    def outside(self, xs, ys, hull):
+        if len(hull) < 3:
+            return list(range(len(xs)))
+        upper, lower = hull.chains()
+
+        if np is not None:
+            xs_array, ys_array = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+            below = self.side_vectorized(xs_array, ys_array, np.array(upper)) < 0
+            above = self.side_vectorized(xs_array, ys_array, np.array(lower)) > 0
+            return np.flatnonzero(~(below & above)).tolist()
+
+        upper_xs, lower_xs = [xs[i] for i in upper], [xs[i] for i in lower]
+        survivors = []
+        for p in range(len(xs)):
+            x, y = xs[p], ys[p]
+            j = min(max(bisect_right(upper_xs, x), 1), len(upper) - 1)
+            a, b = upper[j - 1], upper[j]
+            if orient(xs[a], ys[a], xs[b], ys[b], x, y) < 0:
+                j = min(max(bisect_right(lower_xs, x), 1), len(lower) - 1)
+                a, b = lower[j - 1], lower[j]
+                if orient(xs[a], ys[a], xs[b], ys[b], x, y) > 0:
+                    continue
+            survivors.append(p)
+        return survivors
+
+    # O(n log k): sign of every point against the edge of chain (increasing x) spanning
+    # its x, 1 left of it, -1 right of it, 0 on its line
+    def side_vectorized(self, xs, ys, chain):
+        chain_xs = xs[chain]
+        j = np.clip(np.searchsorted(chain_xs, xs, side='right'), 1, len(chain) - 1)
+        a, b = chain[j - 1], chain[j]
+        return np.sign(orient_array(xs[a], ys[a], xs[b], ys[b], xs, ys))
+
+    # Exact hull by way of the approximate one; same interface as the other engines
+    def compute_hull(self, xs, ys, order=None, observer=None):  # returns hull
+        hull, width = self.approximate(xs, ys)
+        return self.refine(xs, ys, hull)
@@ -0,0 +1,203 @@
+from array import array
+
+from ConvexHullSolver import ConvexHullSolver
+from predicates import ERROR_BOUND, orient_array
+from presort import comparison_order
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Extreme points per group in the polygon interior points are filtered by
+DIRECTIONS = 8
+
+# Many small independent hulls in one call, for per-cluster or per-tile outlines
+# where the fixed cost of a compute_hull call (solver, presort, Hull) per group
+# outweighs the hull itself. Groups arrive ragged in one flat buffer: group g is
+# xs[offsets[g]:offsets[g + 1]], ys likewise. The hulls come back the same way,
+# as one flat array of vertex indices into xs, ys with offsets per group, plus
+# each hull's right_most_index. Every ring is clockwise from its leftmost point
+# like the ones ConvexHullSolver builds.
+#
+# With NumPy all groups are sorted by one lexsort on (group, x, y), points
+# inside the octagon of their group's extreme points are thrown away in bulk
+# (the Akl-Toussaint filter NumpyHullSolver uses, with eight directions), and then the upper and lower chains of Andrew's monotone chain are built for every group at
+# once: step k pushes the k-th point of each group that has one, after popping
+# whatever it makes non-convex, each step being a handful of kernels over the
+# groups. Groups are ordered by size so the ones still running are always a
+# prefix. Without NumPy each group goes through ConvexHullSolver.compute_ring.
+
+
+class BatchHullSolver:
+
+    def __init__(self, solver=None):
+        self.solver = solver or ConvexHullSolver()
+
+    def check_offsets(self, n, offsets):
+        if len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != n:
+            raise Exception('Batch offsets must run from 0 to the number of points ({})'.format(n))
+        if any(offsets[g] > offsets[g + 1] for g in range(len(offsets) - 1)):
+            raise Exception('Batch offsets must not decrease')
+
+    # O(N log N) for N points in all: returns vertices, hull_offsets, right_most_indices
+    def compute_hulls(self, xs, ys, offsets):
+        if np is None:
+            return self.compute_hulls_python(xs, ys, offsets)
+
+        xs, ys = np.ascontiguousarray(xs, dtype=np.float64), np.ascontiguousarray(ys, dtype=np.float64)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        self.check_offsets(len(xs), offsets)
+        groups = len(offsets) - 1
+        if groups == 0:
+            return np.empty(0, np.int64), offsets, np.empty(0, np.int64)
+
+        # One sort for every group, then exact duplicates dropped: O(N log N). Like
+        # presort.comparison_order, the (x, y) sort only runs when some x value is shared;
+        # otherwise the global x rank plus the group number is an exact integer key.
+        group_of = np.repeat(np.arange(groups), np.diff(offsets))
+        by_x = np.argsort(xs)
+        sorted_xs = xs[by_x]
+        if (sorted_xs[1:] == sorted_xs[:-1]).any():
+            order = np.lexsort((ys, xs, group_of))
+            sorted_groups, sorted_xs, sorted_ys = group_of[order], xs[order], ys[order]
+            keep = np.ones(len(order), dtype=bool)
+            keep[1:] = (sorted_groups[1:] != sorted_groups[:-1]) | (sorted_xs[1:] != sorted_xs[:-1]) | (sorted_ys[1:] != sorted_ys[:-1])
+            order = order[keep]
+        else:
+            rank = np.empty(len(xs), dtype=np.int64)
+            rank[by_x] = np.arange(len(xs))
+            order = np.argsort(group_of * len(xs) + rank)
+
+        # Interior points of every group dropped at once, O(N)
+        order = order[~self.interior(xs, ys, order, np.bincount(group_of[order], minlength=groups))]
+
+        # Each chain only needs the points not certainly on the other side of its group's
+        # line from leftmost to rightmost point, which halves the steps it takes
+        side = self.side(xs, ys, order, np.bincount(group_of[order], minlength=groups))
+        upper, lower = order[side >= 0], order[side <= 0]
+        upper = self.chains(xs, ys, upper, np.bincount(group_of[upper], minlength=groups), 1)
+        lower = self.chains(xs, ys, lower, np.bincount(group_of[lower], minlength=groups), -1)
+        return self.rings(upper, lower)
+
+    # O(N): True for the points of order that lie strictly inside the octagon of
+    # their group's extreme points in eight directions. Those points are inside the
+    # hull and can be dropped; any point whose test is not certain under the orient
+    # error bound is kept. order holds the groups one after another, counts[g] points
+    # of group g, so per group values are spread over their points with np.repeat.
+    def interior(self, xs, ys, order, counts):
+        if len(order) == 0:
+            return np.zeros(0, dtype=bool)
+        present = np.flatnonzero(counts)
+        starts = (np.cumsum(counts) - counts)[present]
+        sorted_xs, sorted_ys = xs[order], ys[order]
+
+        # Counter-clockwise octagon of extreme points as indices into order: the largest
+        # x, x + y, y, then the smallest x - y, x, x + y, y and the largest x - y
+        projections = (sorted_xs, sorted_xs + sorted_ys, sorted_ys, sorted_xs - sorted_ys)
+        extremes = np.zeros((DIRECTIONS, len(counts)), dtype=np.int64)
+        for d in range(DIRECTIONS):
+            projection = projections[d % 4]
+            reduce = np.maximum if d in (0, 1, 2, 7) else np.minimum
+            extreme = reduce.reduceat(projection, starts)
+            on_edge = np.flatnonzero(projection == np.repeat(extreme, counts[present]))
+            firsts = np.unique(np.searchsorted(starts, on_edge, side='right'), return_index=True)[1]
+            extremes[d, present] = on_edge[firsts]
+
+        inside = np.ones(len(order), dtype=bool)
+        proper = np.zeros(len(order), dtype=bool)
+        corner_xs, corner_ys = sorted_xs[extremes], sorted_ys[extremes]
+        for d in range(DIRECTIONS):
+            following = (d + 1) % DIRECTIONS
+            edge = extremes[d] != extremes[following]
+            ax, ay = np.repeat(corner_xs[d], counts), np.repeat(corner_ys[d], counts)
+            dx = np.repeat(corner_xs[following] - corner_xs[d], counts)
+            dy = np.repeat(corner_ys[following] - corner_ys[d], counts)
+            det_left = dx * (sorted_ys - ay)
+            det_right = dy * (sorted_xs - ax)
+            edge = np.repeat(edge, counts)
+            inside &= ~edge | (det_left - det_right > ERROR_BOUND * (np.abs(det_left) + np.abs(det_right)))
+            proper |= edge
+        return inside & proper
+
+    # O(N): for the points of order, grouped like in interior, 1 if left of (above) the
+    # line from their group's leftmost to its rightmost point, -1 if right of (below)
+    # it, 0 if on it
+    def side(self, xs, ys, order, counts):
+        stops = np.cumsum(counts)
+        present = np.flatnonzero(counts)
+        first, last = order[(stops - counts)[present]], order[stops[present] - 1]
+        ax, ay = np.repeat(xs[first], counts[present]), np.repeat(ys[first], counts[present])
+        bx, by = np.repeat(xs[last], counts[present]), np.repeat(ys[last], counts[present])
+        return np.sign(orient_array(ax, ay, bx, by, xs[order], ys[order]))
+
+    # O(N) kernels per step, O(max group size) steps: the upper (sign 1) or lower (sign -1)
+    # chain of every group of order, sizes[g] points of group g, as a stack per group in
+    # a flat buffer laid out like order, with the height and start of each stack
+    def chains(self, xs, ys, order, sizes, sign):
+        stack = np.empty(len(order), dtype=np.int64)
+        starts = np.cumsum(sizes) - sizes
+
+        # Largest groups first, so the groups with a k-th point are a prefix
+        by_size = np.argsort(-sizes, kind='stable')
+        running, descending = starts[by_size], sizes[by_size]
+        ascending = descending[::-1]
+        heights = np.zeros(len(sizes), dtype=np.int64)
+
+        for k in range(int(descending[0]) if len(descending) else 0):
+            active = len(ascending) - np.searchsorted(ascending, k, side='right')
+            points = order[running[:active] + k]
+
+            # Pop while the last two stack points and the new one do not turn the chain's way
+            candidates = np.flatnonzero(heights[:active] >= 2)
+            while len(candidates):
+                base = running[candidates] + heights[candidates]
+                a, b, c = stack[base - 2], stack[base - 1], points[candidates]
+                turn = orient_array(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c])
+                candidates = candidates[sign * turn >= 0]
+                heights[candidates] -= 1
+                candidates = candidates[heights[candidates] >= 2]
+
+            stack[running[:active] + heights[:active]] = points
+            heights[:active] += 1
+
+        top = np.empty_like(heights)
+        top[by_size] = heights
+        return stack, top, starts
+
+    # O(h) in all: each ring is its upper chain, then its lower chain backwards without its ends
+    def rings(self, upper, lower):
+        upper_stack, upper_top, upper_starts = upper
+        lower_stack, lower_top, lower_starts = lower
+        lower_count = np.maximum(lower_top - 2, 0)
+        hull_offsets = np.concatenate(([0], np.cumsum(upper_top + lower_count)))
+        vertices = np.empty(hull_offsets[-1], dtype=np.int64)
+
+        # Upper chain position j goes to hull position j
+        groups = np.repeat(np.arange(len(upper_top)), upper_top)
+        j = np.arange(len(groups)) - np.repeat(np.cumsum(upper_top) - upper_top, upper_top)
+        vertices[hull_offsets[groups] + j] = upper_stack[upper_starts[groups] + j]
+
+        # Lower chain position lower_top - 2 - j goes to hull position upper_top + j
+        groups = np.repeat(np.arange(len(lower_top)), lower_count)
+        j = np.arange(len(groups)) - np.repeat(np.cumsum(lower_count) - lower_count, lower_count)
+        vertices[hull_offsets[groups] + upper_top[groups] + j] = lower_stack[lower_starts[groups] + lower_top[groups] - 2 - j]
+
+        right_most_indices = np.maximum(upper_top - 1, 0)
+        return vertices, hull_offsets, right_most_indices
+
+    # O(N log N): one presort and compute_ring per group, without Hull objects
+    def compute_hulls_python(self, xs, ys, offsets):
+        self.check_offsets(len(xs), offsets)
+        vertices, hull_offsets, right_most_indices = array('q'), array('q', [0]), array('q')
+        for g in range(len(offsets) - 1):
+            start, stop = offsets[g], offsets[g + 1]
+            order = [start + i for i in comparison_order(xs[start:stop], ys[start:stop])]
+            if len(order) < 2:
+                ring, right_most_index = order, 0
+            else:
+                ring, right_most_index = self.solver.compute_ring(xs, ys, order, 0, len(order))
+            vertices.extend(ring)
+            hull_offsets.append(len(vertices))
+            right_most_indices.append(right_most_index)
+        return vertices, hull_offsets, right_most_indices
@@ -0,0 +1,229 @@
+import math
+
+from ConvexHullSolver import ConvexHullSolver
+from Hull import Hull
+from predicates import orient
+
+# Output-sensitive O(n log h) engine (Chan's algorithm) for inputs whose hull is
+# tiny compared to n, such as Gaussian clouds. For a guess m the points are cut
+# into groups of m, each group is hulled with the divide and conquer core, and a
+# Jarvis march wraps the whole set by asking every group for its tangent from
+# the current vertex in O(log m). If the march has not closed after m steps the
+# guess was too small and m is squared. Once m would cover most of the input, or
+# the march outgrows its work budget, the hull is evidently large and the plain
+# divide and conquer solver takes over.
+#
+# Hulling every group means sorting every point, which in Python costs about as
+# much as the divide and conquer solve itself. So the input is filtered first:
+# the extreme polygon of a sample of the points is a polygon of input points,
+# nothing strictly inside it can be a hull vertex, and an axis-parallel box
+# inside it tests a point in four comparisons. On clouds that leaves a few
+# thousand points of a million, and only those are presorted and grouped.
+
+# Falls back to divide and conquer once a group would hold at least n / this many points
+FALLBACK_GROUPS = 8
+
+# First guess for m; squaring from here gives 256, 65536, ... Smaller guesses only
+# pay for extra group hulls in Python without making the march any cheaper.
+INITIAL_GROUP_SIZE = 256
+
+# Directions used to build the pruning polygon
+PRUNE_DIRECTIONS = 16
+
+# Points sampled for the polygon the input filter box is fitted into
+FILTER_SAMPLE = 4096
+
+# Box sizes tried, as shares of the filter polygon's extent around its centroid
+FILTER_BOX_SCALES = (0.7, 0.6, 0.5, 0.4)
+
+# Share of n the Jarvis march may spend on group queries before handing over
+MARCH_BUDGET = 4
+
+# Rings this small are searched linearly
+LINEAR_TANGENT_SIZE = 8
+
+
+class ChanHullSolver(ConvexHullSolver):
+
+    # O(n): compute_hull only sorts the points that survive its filter, so this is just
+    # every index in input order
+    def sort_points_by_x(self, xs, ys):
+        return list(range(len(xs)))
+
+    # O(m log m): clockwise ring of indices for the group order[start:stop], which is in
+    # increasing (x, y) order
+    def group_ring(self, xs, ys, order, start, stop):
+        if stop - start < 2:
+            return order[start:stop]
+        ring, right_most_index = self.compute_ring(xs, ys, order, start, stop)
+        return ring
+
+    # O(k * PRUNE_DIRECTIONS): clockwise polygon of the most extreme of the given vertices
+    # in PRUNE_DIRECTIONS evenly spaced directions, as indices; fewer than 3 if they are
+    # all collinear
+    def extreme_polygon(self, xs, ys, vertices):
+        # Extremes by decreasing angle from 180 degrees, so the polygon runs clockwise
+        polygon = []
+        for j in range(PRUNE_DIRECTIONS):
+            angle = math.pi - 2 * math.pi * j / PRUNE_DIRECTIONS
+            dx, dy = math.cos(angle), math.sin(angle)
+            extreme = max(vertices, key=lambda i: xs[i] * dx + ys[i] * dy)
+            if not polygon or polygon[-1] != extreme:
+                polygon.append(extreme)
+        if len(polygon) > 1 and polygon[0] == polygon[-1]:
+            polygon.pop()
+        return polygon
+
+    # O(n): the indices of order not strictly inside a box that lies inside the extreme
+    # polygon of a sample of them. Every point of the polygon's interior is strictly
+    # inside a triangle of input points, so none of the dropped points is a hull vertex.
+    def filter(self, xs, ys, order):
+        if len(order) < 3:
+            return order
+        polygon = self.extreme_polygon(xs, ys, order[::max(1, len(order) // FILTER_SAMPLE)])
+        if len(polygon) < 3:
+            return order
+        edges = [(polygon[j], polygon[(j + 1) % len(polygon)]) for j in range(len(polygon))]
+        polygon_xs, polygon_ys = [xs[i] for i in polygon], [ys[i] for i in polygon]
+        center_x, center_y = sum(polygon_xs) / len(polygon), sum(polygon_ys) / len(polygon)
+        width, height = max(polygon_xs) - min(polygon_xs), max(polygon_ys) - min(polygon_ys)
+
+        # The polygon is convex, so a box whose corners are all inside it is inside it
+        for scale in FILTER_BOX_SCALES:
+            left, right = center_x - scale * width / 2, center_x + scale * width / 2
+            bottom, top = center_y - scale * height / 2, center_y + scale * height / 2
+            if all(orient(xs[a], ys[a], xs[b], ys[b], x, y) < 0
+                   for x in (left, right) for y in (bottom, top) for a, b in edges):
+                return [i for i in order if not (left < xs[i] < right and bottom < ys[i] < top)]
+        return order
+
+    # O(1): True if c is a better wrapping candidate than b when leaving p clockwise,
+    # i.e. c is left of p->b, or collinear with it and farther away
+    def better(self, xs, ys, p, b, c):
+        turn = orient(xs[p], ys[p], xs[b], ys[b], xs[c], ys[c])
+        return turn > 0 or (turn == 0 and self.farther(xs, ys, p, c, b))
+
+    # O(k)
+    def linear_tangent(self, xs, ys, ring, p):
+        best = None
+        for c in ring:
+            if c != p and (best is None or self.better(xs, ys, p, best, c)):
+                best = c
+        return best
+
+    # O(log k): the vertex of a clockwise ring that every other vertex is right of (or
+    # behind) when seen from an outside point p. Along the ring, g(i) = "ring[i + 1] is
+    # better than ring[i]" is true on the chain facing p and false on the far chain, and
+    # the tangent is where it flips. Comparing each vertex against ring[0] makes that
+    # flip point a monotone predicate over 1..k-1, so a binary search finds it.
+    def tangent(self, xs, ys, ring, p):
+        k = len(ring)
+        if k <= LINEAR_TANGENT_SIZE:
+            return self.linear_tangent(xs, ys, ring, p)
+
+        def g(i):
+            return self.better(xs, ys, p, ring[i], ring[(i + 1) % k])
+
+        anchor = ring[0]
+        if g(0):
+            # ring[0] faces p: the tangent is the first vertex that is not both better than ring[0] and still rising
+            def past(i):
+                return not (self.better(xs, ys, p, anchor, ring[i]) and g(i))
+        elif g(k - 1):
+            return self.settle(xs, ys, ring, p, 0)
+        else:
+            # ring[0] is on the far chain: the tangent is the first vertex better than ring[0] and already falling
+            def past(i):
+                return self.better(xs, ys, p, anchor, ring[i]) and not g(i)
+
+        low, high = 1, k - 1
+        while low < high:
+            middle = (low + high) // 2
+            if past(middle):
+                high = middle
+            else:
+                low = middle + 1
+        return self.settle(xs, ys, ring, p, low)
+
+    # O(1) check of a binary search answer, with a linear rescan if degenerate input fooled it
+    def settle(self, xs, ys, ring, p, index):
+        k = len(ring)
+        t = ring[index]
+        if self.better(xs, ys, p, t, ring[(index + 1) % k]) or self.better(xs, ys, p, t, ring[index - 1]):
+            return self.linear_tangent(xs, ys, ring, p)
+        return t
+
+    # O(total ring size * PRUNE_DIRECTIONS): drops group vertices strictly inside the polygon
+    # of the most extreme vertices in PRUNE_DIRECTIONS evenly spaced directions, an
+    # Akl-Toussaint filter with more corners. They can never be hull vertices, and for
+    # cloud-like inputs most groups vanish entirely, which is what keeps the march cheap.
+    # A vertex subset of a convex ring is still a convex ring.
+    def prune(self, xs, ys, rings):
+        polygon = self.extreme_polygon(xs, ys, [v for ring in rings for v in ring])
+        if len(polygon) < 3:
+            return rings
+        edges = [(polygon[j], polygon[(j + 1) % len(polygon)]) for j in range(len(polygon))]
+
+        def outside(v):
+            return any(orient(xs[a], ys[a], xs[b], ys[b], xs[v], ys[v]) >= 0 for a, b in edges)
+
+        pruned = [[v for v in ring if outside(v)] for ring in rings]
+        return [ring for ring in pruned if ring]
+
+    # O(steps * total ring size / log m); returns the clockwise ring, or None if it
+    # did not close within max_steps vertices
+    def march(self, xs, ys, rings, max_steps):
+        # Each hull vertex's own group answers with its clockwise successor
+        successor = {}
+        group = {}
+        for g in range(len(rings)):
+            ring = rings[g]
+            for i in range(len(ring)):
+                successor[ring[i]] = ring[(i + 1) % len(ring)]
+                group[ring[i]] = g
+
+        first = min((ring[0] for ring in rings), key=lambda i: (xs[i], ys[i]))
+        hull = [first]
+        p = first
+        for step in range(max_steps):
+            best = None
+            own_group = group.get(p)
+            for g in range(len(rings)):
+                if g == own_group:
+                    candidate = successor[p]
+                else:
+                    candidate = self.tangent(xs, ys, rings[g], p)
+                if candidate is not None and candidate != p and (best is None or self.better(xs, ys, p, best, candidate)):
+                    best = candidate
+            if best is None or best == first:
+                return hull
+            hull.append(best)
+            p = best
+        return None
+
+    # O(n log h), or divide and conquer if the hull turns out to be large
+    def compute_hull(self, xs, ys, order=None, observer=None):  # returns hull; observer is accepted for interface compatibility only
+        if order is None:
+            order = self.sort_points_by_x(xs, ys)
+        # Only the points the filter keeps are presorted, which also drops exact duplicates
+        order = self.filter(xs, ys, order)
+        order = [order[i] for i in ConvexHullSolver.sort_points_by_x(self, [xs[i] for i in order], [ys[i] for i in order])]
+        n = len(order)
+        m = INITIAL_GROUP_SIZE
+        while n >= 2 and m * FALLBACK_GROUPS < n:
+            rings = self.prune(xs, ys, [self.group_ring(xs, ys, order, start, min(start + m, n)) for start in range(0, n, m)])
+
+            # The march may not spend more than n / MARCH_BUDGET group queries in total
+            max_steps = min(m, n // (MARCH_BUDGET * len(rings)))
+            ring = self.march(xs, ys, rings, max_steps)
+            if ring is not None:
+                right_most_index = max(range(len(ring)), key=lambda i: (xs[ring[i]], ys[ring[i]]))
+                return Hull(xs, ys, ring, right_most_index)
+
+            if max_steps < m:
+                # Too many surviving group vertices to march around cheaply; they still hold every hull vertex
+                survivors = sorted((v for ring in rings for v in ring), key=lambda i: (xs[i], ys[i]))
+                return ConvexHullSolver.compute_hull(self, xs, ys, survivors)
+            m = min(m * m, n)
+
+        return ConvexHullSolver.compute_hull(self, xs, ys, order)
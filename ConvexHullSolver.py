@@ -1,301 +1,365 @@
-from operator import methodcaller
-from enum import Enum, auto
 from Hull import Hull
-
-from which_pyqt import PYQT_VER
-if PYQT_VER == 'PYQT5':
-    from PyQt5.QtCore import QLineF, QPointF, QThread, pyqtSignal
-elif PYQT_VER == 'PYQT4':
-    from PyQt4.QtCore import QLineF, QPointF, QThread, pyqtSignal
-else:
-    raise Exception('Unsupported Version of PyQt: {}'.format(PYQT_VER))
-
-class Side(Enum):
-    L = auto()
-    R = auto()
-    W = auto()
+from HullProgress import CHECK_LEVEL
+from predicates import line_gap, orient
+from presort import default_presort
+
+# Headless divide and conquer core. Points are plain coordinate sequences xs, ys
+# (lists, array('d') or NumPy arrays) and everything below works on indices into
+# them, so no Qt objects are created per point. The presort stage (see presort.py)
+# produces a permutation of those indices in (x, y) order, and the merge levels
+# work on ranges of that permutation rather than reordered coordinates. ConvexHullSolverThread in
+# convex_hull.py adapts this to QPointF/QLineF and the GUI signals.
+#
+# Every partial hull is kept as a clockwise ring of indices that starts at its
+# leftmost point, together with the ring position of its rightmost point.
+# Positions 0..right_most_index are the upper chain and right_most_index..0
+# (wrapping) the lower chain, so merging two hulls only needs the tangent positions.
+
+# Tangent walk steps before the search switches to find_bridge. Almost every merge finds its
+# tangents within a few steps, which no binary search beats; the rare merge that drops many
+# vertices costs O(log h) instead of one step per dropped vertex.
+WALK_STEPS = 8
 
 class ConvexHullSolver:
 
-    # O(n log n)
-    def sort_points_by_x(self, points):
-        points.sort(key=methodcaller('x'))
-
-    # O(1)
-    def calculate_slope(self, left_point, right_point):
-        rise = right_point.y() - left_point.y()
-        run = right_point.x() - left_point.x()
-
-        return rise / run
-
-        # O(n/2) + O(3n/4) = O(3n/4) = O(n)
-    def delete_points_and_lines(self, points, top_index, bottom_index, lines, convex_hull):
-        bottom_point = points[bottom_index]
-        points_to_delete = list()
-
-        index = (top_index - 1) % len(points)
-
-        # O(n/2) = O(n)
-        while points[index] != bottom_point:
-            points_to_delete.append(points.pop(index))
-            index = (index - 1) % len(points)
-
-        i = 0
-
-        # O(3n/4) = O(n)
-        while i < len(lines):
-            if lines[i].p1() in points_to_delete or lines[i].p2() in points_to_delete:
-                if convex_hull.pause:
-                    convex_hull.erase_hull.emit([lines[i]])
-                lines.pop(i)
+    # Indexes coordinates one at a time, so Python lists are faster than NumPy arrays
+    vectorized = False
+
+    # profiler is an optional HullProfiler (see HullProfiler.py) and progress an
+    # optional HullProgress (see HullProgress.py); without them the hot path only
+    # pays a None check per merge
+    def __init__(self, presort=None, profiler=None, progress=None):
+        self.presort = presort or default_presort
+        self.profiler = profiler
+        self.progress = progress
+
+    # O(n log n): returns the indices of xs, ys in increasing (x, y) order with exact
+    # duplicates dropped. Shared x values are fine; ties are broken by y.
+    def sort_points_by_x(self, xs, ys):
+        profiler = self.profiler
+        if profiler is None:
+            return self.presort(xs, ys)
+        t1 = profiler.clock()
+        order = self.presort(xs, ys)
+        profiler.presort_time += profiler.clock() - t1
+        return order
+
+    # O(1): True if candidate is collinear with origin and current but farther from origin,
+    # so collinear tangent points always settle on the outermost one
+    def farther(self, xs, ys, origin, candidate, current):
+        ox, oy = xs[origin], ys[origin]
+        return (xs[candidate] - ox) ** 2 + (ys[candidate] - oy) ** 2 > (xs[current] - ox) ** 2 + (ys[current] - oy) ** 2
+
+    # O(k) for the k edges walked clockwise from start to stop; start == stop walks the whole ring
+    def ring_edges(self, ring, start, stop):
+        edges = []
+        index = start
+        while True:
+            next_index = (index + 1) % len(ring)
+            edges.append((ring[index], ring[next_index]))
+            index = next_index
+            if index == stop:
+                return edges
+
+    # O(log h): the tangent point on a chain, from a point before all of it in (x, y)
+    # order, searched between chain positions low and high. Chain position c of a ring is
+    # ring position (direction * c) % size: the upper chain (direction 1, sign -1) runs
+    # clockwise from the leftmost point and the lower chain (direction -1, sign 1)
+    # counter-clockwise from it. Collinear candidates settle on the farther one.
+    def chain_tangent(self, xs, ys, px, py, buffer, start, size, low, high, direction, sign):
+        while low < high:
+            middle = (low + high) // 2
+            c, d = buffer[start + (direction * middle) % size], buffer[start + (direction * (middle + 1)) % size]
+            if sign * orient(px, py, xs[c], ys[c], xs[d], ys[d]) <= 0:
+                low = middle + 1
             else:
-                i += 1
-
-    # O(n^2)
-    def combine_hulls(self, left_points, left_hull, right_points, right_hull, side, convex_hull): # returns combined hull, points
+                high = middle
+        return low
+
+    # O(log h_left + log h_right): chain positions of the bridge between the same chain of two
+    # rings that are runs of one buffer, the left ring before the right one in (x, y) order,
+    # after Overmars and van Leeuwen. The bridge is known to start at left chain position
+    # left_high or before and to end at right chain position right_low or after. Each step
+    # takes the middle edge (a, b) of what is left of the left chain and (c, d) of the right
+    # one. c or d on the outer side of line a->b puts the bridge at a or before it, a or b on
+    # the outer side of c->d puts it after c; both are exact. Otherwise the two lines cross, and where they cross relative to the
+    # gap between the rings rules out the near half of one chain. Only when the rings share
+    # an x and the crossing is right on it does the left half get a tangent search instead.
+    def find_bridge(self, xs, ys, buffer, left_start, left_size, left_right_most, left_high,
+                    right_start, right_size, right_length, right_low, sign):
+        direction = -sign
+        left_low, right_high = 0, right_length - 1
+        # Both chains end at the left ring's rightmost point and start at the right ring's leftmost
+        left_x = xs[buffer[left_start + left_right_most]]
+        right_x = xs[buffer[right_start]]
+
+        while left_low < left_high and right_low < right_high:
+            i, j = (left_low + left_high) // 2, (right_low + right_high) // 2
+            a, b = buffer[left_start + (direction * i) % left_size], buffer[left_start + (direction * (i + 1)) % left_size]
+            c, d = buffer[right_start + (direction * j) % right_size], buffer[right_start + (direction * (j + 1)) % right_size]
+            ax, ay, bx, by, cx, cy, dx, dy = xs[a], ys[a], xs[b], ys[b], xs[c], ys[c], xs[d], ys[d]
+
+            before = sign * orient(ax, ay, bx, by, cx, cy) <= 0 or sign * orient(ax, ay, bx, by, dx, dy) <= 0
+            after = sign * orient(cx, cy, dx, dy, ax, ay) <= 0 or sign * orient(cx, cy, dx, dy, bx, by) <= 0
+            if before:
+                left_high = i
+            if after:
+                right_low = j + 1
+            if before or after:
+                continue
+
+            # The lines are not parallel here. Where a->b crosses c->d is left of the right ring
+            # unless the bridge starts at a or before, and right of the left ring unless it ends
+            # after c. A vertical edge can only be the first of an upper or the last of a lower chain.
+            if ax == bx:
+                crossing_left, crossing_right = ax < right_x, ax > left_x
+            elif cx == dx:
+                crossing_left, crossing_right = cx < right_x, cx > left_x
+            else:
+                crossing_left = sign * line_gap(right_x, ax, ay, bx, by, cx, cy, dx, dy) < 0
+                crossing_right = sign * line_gap(left_x, ax, ay, bx, by, cx, cy, dx, dy) > 0
+            if crossing_left:
+                left_low = i + 1
+            elif crossing_right:
+                right_high = j
+            else:
+                t = buffer[right_start + (direction * self.chain_tangent(
+                    xs, ys, bx, by, buffer, right_start, right_size, 0, right_length - 1, direction, sign)) % right_size]
+                if sign * orient(ax, ay, bx, by, xs[t], ys[t]) <= 0:
+                    left_high = i
+                else:
+                    left_low = i + 1
+
+        # One side is settled; the other end of the bridge is a tangent from it
+        q = buffer[right_start + (direction * right_low) % right_size]
+        qx, qy = xs[q], ys[q]
+        while left_low < left_high:
+            i = (left_low + left_high) // 2
+            a, b = buffer[left_start + (direction * i) % left_size], buffer[left_start + (direction * (i + 1)) % left_size]
+            if sign * orient(xs[a], ys[a], xs[b], ys[b], qx, qy) <= 0:
+                left_high = i
+            else:
+                left_low = i + 1
+        p = buffer[left_start + (direction * left_low) % left_size]
+        right_low = self.chain_tangent(xs, ys, xs[p], ys[p], buffer, right_start, right_size, right_low, right_high, direction, sign)
+        return left_low, right_low
+
+    # O(min(k, WALK_STEPS + log h)) for tangent points k vertices away. Both hulls are runs of one
+    # buffer: the left ring is buffer[left_start:left_start + left_size], the right one
+    # buffer[right_start:right_start + right_size]. Returns positions within the runs.
+    def find_upper_tangent(self, xs, ys, buffer, left_start, left_size, left_right_most, right_start, right_size, right_right_most):
+        left_index, right_index = left_right_most, 0
+        left_point, right_point = buffer[left_start + left_index], buffer[right_start]
         left_changed = True
         right_changed = True
 
-        left_index_top, right_index_top = 0, 0
-
-        # O(1)
-        current_new_line = QLineF(left_points[left_index_top], right_points[right_index_top])
-        if convex_hull.pause:
-            convex_hull.show_hull.emit([current_new_line], (0, 255, 0))
-        slope_current = self.calculate_slope(current_new_line.p1(), current_new_line.p2())
-
-        # O(n)
-        # find new top line
+        # Left moves counter-clockwise and right moves clockwise while the next vertex lies above the tangent.
+        # Neither ever passes its tangent point, so a walk that runs long hands what is left to find_bridge.
+        steps = WALK_STEPS
         while left_changed or right_changed:
-            potential_new_line = QLineF(left_points[(left_index_top + 1) % len(left_points)], right_points[right_index_top])
-            if convex_hull.pause:
-                convex_hull.show_hull.emit([potential_new_line], (0, 0, 255))
-            slope_new = self.calculate_slope(potential_new_line.p1(), potential_new_line.p2())
-            if slope_new < slope_current:
-                if convex_hull.pause:
-                    convex_hull.erase_hull.emit([current_new_line, potential_new_line])
-                current_new_line = potential_new_line
-                if convex_hull.pause:
-                    convex_hull.show_hull.emit([current_new_line], (0, 255, 0))
-                slope_current = slope_new
-                left_index_top += 1
-                left_changed = True
-            else:
-                if convex_hull.pause:
-                    convex_hull.erase_hull.emit([potential_new_line])
-                left_changed = False
-
-            potential_new_line = QLineF(left_points[left_index_top], right_points[(right_index_top + 1) % len(right_points)])
-            if convex_hull.pause:
-                convex_hull.show_hull.emit([potential_new_line], (0, 0, 255))
-            slope_new = self.calculate_slope(potential_new_line.p1(), potential_new_line.p2())
-            if slope_new > slope_current:
-                if convex_hull.pause:
-                    convex_hull.erase_hull.emit([current_new_line, potential_new_line])
-                current_new_line = potential_new_line
-                if convex_hull.pause:
-                    convex_hull.show_hull.emit([current_new_line], (0, 255, 0))
-                slope_current = slope_new
-                right_index_top += 1
-                right_changed = True
-            else:
-                if convex_hull.pause:
-                    convex_hull.erase_hull.emit([potential_new_line])
-                right_changed = False
-
-        if convex_hull.pause:
-            convex_hull.erase_hull.emit([current_new_line])
-        new_top_edge = current_new_line
-        if convex_hull.pause:
-            convex_hull.show_hull.emit([new_top_edge], (255, 0, 0))
-
-        # Find bottom line
+            if not steps:
+                return self.find_bridge(xs, ys, buffer, left_start, left_size, left_right_most, left_index,
+                                        right_start, right_size, right_right_most + 1, right_index, -1)
+            steps -= 1
+            candidate = (left_index - 1) % left_size
+            point = buffer[left_start + candidate]
+            turn = orient(xs[left_point], ys[left_point], xs[right_point], ys[right_point], xs[point], ys[point])
+            left_changed = turn > 0 or (turn == 0 and self.farther(xs, ys, right_point, point, left_point))
+            if left_changed:
+                left_index, left_point = candidate, point
+
+            candidate = (right_index + 1) % right_size
+            point = buffer[right_start + candidate]
+            turn = orient(xs[left_point], ys[left_point], xs[right_point], ys[right_point], xs[point], ys[point])
+            right_changed = turn > 0 or (turn == 0 and self.farther(xs, ys, left_point, point, right_point))
+            if right_changed:
+                right_index, right_point = candidate, point
+
+        return left_index, right_index
+
+    # O(min(k, WALK_STEPS + log h)), on runs of one buffer like find_upper_tangent
+    def find_lower_tangent(self, xs, ys, buffer, left_start, left_size, left_right_most, right_start, right_size, right_right_most):
+        left_index, right_index = left_right_most, 0
+        left_point, right_point = buffer[left_start + left_index], buffer[right_start]
         left_changed = True
         right_changed = True
-        left_index_bottom, right_index_bottom = 0, 0
 
-        # O(n)
-        current_new_line = QLineF(left_points[left_index_bottom], right_points[right_index_bottom])
-        if convex_hull.pause:
-            convex_hull.show_hull.emit([current_new_line], (0, 255, 0))
-        slope_current = self.calculate_slope(current_new_line.p1(), current_new_line.p2())
+        # Left moves clockwise and right moves counter-clockwise while the next vertex lies below the tangent.
+        steps = WALK_STEPS
         while left_changed or right_changed:
-            potential_new_line = QLineF(left_points[(left_index_bottom - 1) % len(left_points)], right_points[right_index_bottom])
-            if convex_hull.pause:
-                convex_hull.show_hull.emit([potential_new_line], (0, 0, 255))
-            slope_new = self.calculate_slope(potential_new_line.p1(), potential_new_line.p2())
-            if slope_new > slope_current:
-                if convex_hull.pause:
-                    convex_hull.erase_hull.emit([current_new_line, potential_new_line])
-                current_new_line = potential_new_line
-                if convex_hull.pause:
-                    convex_hull.show_hull.emit([current_new_line], (0, 255, 0))
-                slope_current = slope_new
-                left_index_bottom = ((left_index_bottom - 1) % len(left_points))
-                left_changed = True
-            else:
-                if convex_hull.pause:
-                    convex_hull.erase_hull.emit([potential_new_line])
-                left_changed = False
-
-            potential_new_line = QLineF(left_points[left_index_bottom], right_points[(right_index_bottom - 1) % len(right_points)])
-            if convex_hull.pause:
-                convex_hull.show_hull.emit([potential_new_line], (0, 0, 255))
-            slope_new = self.calculate_slope(potential_new_line.p1(), potential_new_line.p2())
-            if slope_new < slope_current:
-                if convex_hull.pause:
-                    convex_hull.erase_hull.emit([current_new_line, potential_new_line])
-                current_new_line = potential_new_line
-                if convex_hull.pause:
-                    convex_hull.show_hull.emit([current_new_line], (0, 255, 0))
-                slope_current = slope_new
-                right_index_bottom = ((right_index_bottom - 1) % len(right_points))
-                right_changed = True
-            else:
-                if convex_hull.pause:
-                    convex_hull.erase_hull.emit([potential_new_line])
-                right_changed = False
-
-        if convex_hull.pause:
-            convex_hull.erase_hull.emit([current_new_line])
-        new_bottom_edge = current_new_line
-        if convex_hull.pause:
-            convex_hull.show_hull.emit([new_bottom_edge], (255, 0, 0))
-
-        points_to_check = [left_points[left_index_bottom], left_points[left_index_top], right_points[right_index_top], right_points[right_index_bottom]]
-
-        # Trim point arrays and delete unneeded points & associated lines.
-
-        # O(n)
-        self.delete_points_and_lines(left_points, left_index_top, left_index_bottom, left_hull.getLines(), convex_hull)
-
-        # O(n)
-        self.delete_points_and_lines(right_points, right_index_top, right_index_bottom, right_hull.getLines(), convex_hull)
-
-        # Arrange trimmed arrays and fuse together
-        combined_points = list()
-
-        # O(n log n)
-        if side == side.L:
-            # find rightmost point and pop it off the list. Combine lists and sort for CC order based on slope
-            i = 1
-            right_most_index = 0
-
-            # O(n)
-            while i < len(right_points):
-                if right_points[i].x() > right_points[right_most_index].x():
-                    right_most_index = i
-                i += 1
-
-            # O(n)
-            right_most_point = right_points.pop(right_most_index)
-            right_points.extend(left_points)
-
-            # O(n log n)
-            right_points.sort(key=lambda point: self.calculate_slope(point, right_most_point))
-            right_points.insert(0, right_most_point)
-            combined_points = right_points
-
-        # O(n log n)
+            if not steps:
+                # The lower chains run counter-clockwise, so chain and ring positions are negatives
+                left_bottom, right_bottom = self.find_bridge(
+                    xs, ys, buffer, left_start, left_size, left_right_most, -left_index % left_size,
+                    right_start, right_size, right_size - right_right_most + 1, -right_index % right_size, 1)
+                return -left_bottom % left_size, -right_bottom % right_size
+            steps -= 1
+            candidate = (left_index + 1) % left_size
+            point = buffer[left_start + candidate]
+            turn = orient(xs[left_point], ys[left_point], xs[right_point], ys[right_point], xs[point], ys[point])
+            left_changed = turn < 0 or (turn == 0 and self.farther(xs, ys, right_point, point, left_point))
+            if left_changed:
+                left_index, left_point = candidate, point
+
+            candidate = (right_index - 1) % right_size
+            point = buffer[right_start + candidate]
+            turn = orient(xs[left_point], ys[left_point], xs[right_point], ys[right_point], xs[point], ys[point])
+            right_changed = turn < 0 or (turn == 0 and self.farther(xs, ys, left_point, point, right_point))
+            if right_changed:
+                right_index, right_point = candidate, point
+
+        return left_index, right_index
+
+    # O(n): two tangent searches over adjacent runs of source plus one splice into
+    # out[out_start:], no sorting or searching. Each chain is copied with one slice assignment.
+    def merge_runs(self, xs, ys, source, left_start, left_size, left_right_most, right_start, right_size, right_right_most,
+                   out, out_start, observer=None): # returns size, right_most_index
+        profiler = self.profiler
+        if profiler is not None:
+            t1 = profiler.clock()
+        left_top, right_top = self.find_upper_tangent(xs, ys, source, left_start, left_size, left_right_most, right_start, right_size, right_right_most)
+        if profiler is not None:
+            t2 = profiler.clock()
+        left_bottom, right_bottom = self.find_lower_tangent(xs, ys, source, left_start, left_size, left_right_most, right_start, right_size, right_right_most)
+        if profiler is not None:
+            t3 = profiler.clock()
+
+        if observer is not None:
+            # The left hull loses its edges from the upper to the lower tangent point (through its
+            # rightmost point), the right hull from the lower to the upper one (through its leftmost).
+            left_ring, right_ring = source[left_start:left_start + left_size], source[right_start:right_start + right_size]
+            observer(self.ring_edges(left_ring, left_top, left_bottom) + self.ring_edges(right_ring, right_bottom, right_top),
+                     [(left_ring[left_top], right_ring[right_top]), (right_ring[right_bottom], left_ring[left_bottom])])
+
+        # Left upper chain up to its tangent point, O(n)
+        position = out_start + left_top + 1
+        out[out_start:position] = source[left_start:left_start + left_top + 1]
+
+        # Right hull clockwise from the upper to the lower tangent point, O(n)
+        right_right_most_index = position - out_start + (right_right_most - right_top) % right_size
+        if right_bottom >= right_top:
+            out[position:position + right_bottom + 1 - right_top] = source[right_start + right_top:right_start + right_bottom + 1]
+            position += right_bottom + 1 - right_top
         else:
-            # find leftmost point and pop it off the list. Combine lists and sort for C order based on slope
-            i = 1
-            left_most_index = 0
-
-            # O(n)
-            while i < len(left_points):
-                if left_points[i].x() < left_points[left_most_index].x():
-                    left_most_index = i
-                i += 1
-
-            left_most_point = left_points.pop(left_most_index)
-            left_points.extend(right_points)
-
-            # O(n log n)
-            left_points.sort(key=lambda point: self.calculate_slope(left_most_point, point), reverse=True)
-            left_points.insert(0, left_most_point)
-            combined_points = left_points
-
-        combined_lines = list()
-        # O(n)
-        combined_lines.extend(left_hull.getLines())
-        # O(n)
-        combined_lines.extend(right_hull.getLines())
-        # Check points w/ newly created lines to see if there is a third middle line to delete
-
-        # O(n^2)
-        # O(n)
-        for line in combined_lines:
-            if line.p1() in points_to_check or line.p2() in points_to_check:
-                # O(n)
-                index_p1 = combined_points.index(line.p1())
-                # O(n)
-                index_p2 = combined_points.index(line.p2())
-                distance = abs(index_p1 - index_p2)
-                if distance != 1 and distance != (len(combined_points) - 1):
-                    if convex_hull.pause:
-                        convex_hull.erase_hull.emit([line])
-                    # O(n)
-                    combined_lines.remove(line)
-
-        combined_lines.append(new_top_edge)
-        combined_lines.append(new_bottom_edge)
-
-        return [Hull(combined_lines), combined_points]
-
-    # Master Theorem applies here: a = 2 subproblems of size n/(b = 2) and combines answers in O(n^(d = 2)). Log2(2) = 1 < d = 2, so overall O(n^(d = 2))
-    def compute_hull(self, points, convex_hull, side=Side.W):  # returns hull, points
-        lines = []
-        completed_hull_and_points = None
-
-        # Work at bottom of tree = O(1)
-        # O(1)
-        if len(points) == 2:
-            new_line = QLineF(points[0], points[1])
-            if convex_hull.pause:
-                convex_hull.show_hull.emit([new_line], (255, 0, 0))
-            lines.append(new_line)
-
-            if side == Side.L:
-                points.reverse()
-
-            completed_hull_and_points = [Hull(lines), points]
-
-        # O(1)
-        elif len(points) == 3:
-            # O(1)
-            for i in range(3):
-                new_line = QLineF(points[i], points[(i + 1) % 3])
-                if convex_hull.pause:
-                    convex_hull.show_hull.emit([new_line], (255, 0, 0))
-                lines.append(new_line)
-
-            # O(1)
-            if side == Side.L:
-                right_most_point = points.pop(2)
-
-                # O(1) because there's only ever 2 points
-                points.sort(key=lambda point: self.calculate_slope(point, right_most_point))
-                points.insert(0, right_most_point)
-
-            # O(1)
-            elif side == Side.R:
-                left_most_point = points.pop(0)
-                points.sort(key=lambda point: self.calculate_slope(left_most_point, point), reverse=True)
-                points.insert(0, left_most_point)
-
-            completed_hull_and_points = [Hull(lines), points]
-
-        # Split and combine parts = O(n^2)
-        elif len(points) > 3:
-            # Split parts = O(n)
-            # O(n)
-            left_points, right_points = points[:len(points)//2], points[len(points)//2:]
-            # O(n)
-            left_hull_and_points = self.compute_hull(left_points, convex_hull, Side.L)
-            right_hull_and_points = self.compute_hull(right_points, convex_hull, Side.R)
-
-            # Combine parts = O(n^2)
-            completed_hull_and_points = self.combine_hulls(left_hull_and_points[1], left_hull_and_points[0], right_hull_and_points[1], right_hull_and_points[0], side, convex_hull)
-
-        return completed_hull_and_points
\ No newline at end of file
+            out[position:position + right_size - right_top] = source[right_start + right_top:right_start + right_size]
+            position += right_size - right_top
+            out[position:position + right_bottom + 1] = source[right_start:right_start + right_bottom + 1]
+            position += right_bottom + 1
+
+        # Left lower chain back to the leftmost point, O(n). The leftmost point is already at index 0.
+        if left_bottom != 0:
+            out[position:position + left_size - left_bottom] = source[left_start + left_bottom:left_start + left_size]
+            position += left_size - left_bottom
+
+        if profiler is not None:
+            profiler.merged(left_size, left_right_most, right_size, left_top, right_top, left_bottom, right_bottom,
+                            position - out_start, t1, t2, t3, profiler.clock())
+        return position - out_start, right_right_most_index
+
+    # O(n): merge two separate rings into a new list, for callers that hold them apart
+    def combine_hulls(self, xs, ys, left_ring, left_right_most, right_ring, right_right_most, observer=None): # returns ring, right_most_index
+        source = list(left_ring) + list(right_ring)
+        combined_ring = [0] * len(source)
+        size, right_most_index = self.merge_runs(xs, ys, source, 0, len(left_ring), left_right_most, len(left_ring), len(right_ring),
+                                                 right_right_most, combined_ring, 0, observer)
+        del combined_ring[size:]
+        return combined_ring, right_most_index
+
+    # O(1): writes the ring of two or three sorted points into out[out_start:]
+    def base_ring(self, xs, ys, order, start, stop, out, out_start): # returns size, right_most_index
+        if stop - start == 2:
+            out[out_start], out[out_start + 1] = order[start], order[start + 1]
+            return 2, 1
+
+        # Three sorted points: the middle one goes first if it lies above the outer two
+        # and is dropped if it lies on the segment between them.
+        left, middle, right = order[start], order[start + 1], order[start + 2]
+        turn = orient(xs[left], ys[left], xs[right], ys[right], xs[middle], ys[middle])
+        out[out_start] = left
+        if turn > 0:
+            out[out_start + 1], out[out_start + 2] = middle, right
+            return 3, 2
+        if turn < 0:
+            out[out_start + 1], out[out_start + 2] = right, middle
+            return 3, 1
+        out[out_start + 1] = right
+        return 2, 1
+
+    # Same O(n log n) as the top-down recursion (a = 2 halves, O(n) merges, log2(2) = 1 = d),
+    # without recursion: the range is cut into base runs of 3 points, taken left to right, and
+    # like a binary counter the two newest runs are merged whenever they are the same level.
+    # That does the merges in the order the recursion would, so recently merged points are
+    # still in cache. Rings live in two preallocated buffers: a run of level L sits at the
+    # start of its slot of positions in buffers[L % 2], and merging two runs writes their
+    # ring into the other buffer at the same slot, which only ever held their inputs. So no
+    # ring is sliced out into a list of its own; a merge only allocates its chain copies.
+    # With progress (a HullProgress) the larger merges check in with it, and once its
+    # budget runs out the runs so far are merged into the hull of order[start:start + covered].
+    def compute_ring(self, xs, ys, order, start, stop, observer=None, progress=None): # returns ring, right_most_index
+        n = stop - start
+        buffers = ([0] * n, [0] * n)
+
+        # Base runs of 3 points, with the last one or two holding 2 when n is not a multiple of 3
+        pairs = (3 - n % 3) % 3
+        runs = (n - 2 * pairs) // 3 + pairs
+        levels = (runs - 1).bit_length()
+
+        # Runs waiting to be merged, oldest first: slot start, ring size, right_most_index, level
+        slots, sizes, right_mosts, run_levels = [], [], [], []
+        profiler = self.profiler
+        slot = 0
+        stopped = False
+        for r in range(runs):
+            # Work at bottom = O(1)
+            width = 3 if r < runs - pairs else 2
+            size, right_most_index = self.base_ring(xs, ys, order, start + slot, start + slot + width, buffers[0], slot)
+            if observer is not None:
+                observer([], self.ring_edges(buffers[0][slot:slot + size], 0, 0))
+            slots.append(slot)
+            sizes.append(size)
+            right_mosts.append(right_most_index)
+            run_levels.append(0)
+            slot += width
+
+            # Combine parts = O(n) per level; after the last run, everything left is merged
+            while len(slots) > 1 and (run_levels[-1] == run_levels[-2] or r == runs - 1 or stopped):
+                level = run_levels[-2]
+                source, target = buffers[level % 2], buffers[(level + 1) % 2]
+                left, right = slots[-2], slots[-1]
+                if run_levels[-1] % 2 != level % 2:
+                    source[right:right + sizes[-1]] = target[right:right + sizes[-1]]
+                if profiler is not None:
+                    profiler.depth = max(levels - 1 - level, 0)
+                size, right_most_index = self.merge_runs(xs, ys, source, left, sizes[-2], right_mosts[-2], right, sizes[-1],
+                                                         right_mosts[-1], target, left, observer)
+                del slots[-1], sizes[-1], right_mosts[-1], run_levels[-1]
+                sizes[-1], right_mosts[-1], run_levels[-1] = size, right_most_index, level + 1
+                if progress is not None and (level >= CHECK_LEVEL or stopped):
+                    stopped = progress.merged(r + 1 - len(slots), runs - 1) or stopped
+
+            if stopped and r < runs - 1:
+                progress.covered = slot
+                break
+
+        ring = buffers[run_levels[0] % 2]
+        del ring[sizes[0]:]
+        return ring, right_mosts[0]
+
+    # O(n log n). order is the permutation from sort_points_by_x and is computed here
+    # if not given. observer, if given, is called as observer(erased_edges, added_edges)
+    # with index pairs at every base case and merge, which is what the GUI uses to
+    # animate the recursion.
+    def compute_hull(self, xs, ys, order=None, observer=None):  # returns hull
+        if order is None:
+            order = self.sort_points_by_x(xs, ys)
+        if len(order) < 2:
+            return Hull(xs, ys, order)
+
+        profiler = self.profiler
+        if profiler is not None:
+            t1 = profiler.clock()
+        ring, right_most_index = self.compute_ring(xs, ys, order, 0, len(order), observer, self.progress)
+        if profiler is not None:
+            profiler.ring_time += profiler.clock() - t1
+
+        return Hull(xs, ys, ring, right_most_index)
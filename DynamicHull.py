@@ -0,0 +1,236 @@
+from fractions import Fraction
+
+from Hull import Hull
+from predicates import ERROR_BOUND, orient
+
+# Fully dynamic hull for sliding windows and other streams where points leave as
+# well as arrive, after Overmars and van Leeuwen. The distinct points are the
+# leaves of a weight-balanced binary tree in increasing (x, y) order. Every
+# internal node stores only the bridges of its subtree: the edge joining the upper
+# hull of its left half to the upper hull of its right half, and likewise for the
+# lower hulls. A node's hull is then its left child's hull up to the bridge, the
+# bridge, and its right child's hull from the bridge on, so no chain is stored
+# anywhere and an update only touches the bridges on one root-to-leaf path.
+#
+# Bridges are found by descending the bridge trees themselves. The tangent from a
+# point to a subtree's hull is a single descent, each step comparing the point
+# against that node's bridge; the bridge of two subtrees is a descent of the left
+# one with a tangent query at every step, so O(log^2 n) per bridge and O(log^3 n)
+# per insert or delete. Subtrees that get out of balance are rebuilt, which is
+# O(log n) amortized nodes per update.
+#
+# Repeated points are counted rather than stored twice, so delete removes one
+# copy. Chains follow the conventions of Hull: clockwise from the leftmost
+# (lowest) point, collinear points dropped.
+
+# A subtree is rebuilt once one child holds more than this fraction of its points
+ALPHA = 0.7
+
+# Chain signs, as in Hull.insert_into_chain: the upper chain turns clockwise
+UPPER = -1
+LOWER = 1
+
+
+# Sign of (dx, dy) . (q - p), exact like predicates.orient
+def dot_sign(dx, dy, px, py, qx, qy):
+    dot_left = dx * (qx - px)
+    dot_right = dy * (qy - py)
+    dot = dot_left + dot_right
+    if abs(dot) > ERROR_BOUND * (abs(dot_left) + abs(dot_right)):
+        return dot
+    dot = Fraction(dx) * (Fraction(qx) - Fraction(px)) + Fraction(dy) * (Fraction(qy) - Fraction(py))
+    return (dot > 0) - (dot < 0)
+
+
+class Node:
+    # Leaves hold a point in x, y. Internal nodes hold the largest point of their left
+    # subtree in x, y (to route searches) and their bridges as (px, py, qx, qy).
+    __slots__ = ('left', 'right', 'x', 'y', 'size', 'upper', 'lower')
+
+    def __init__(self, x, y, left=None, right=None):
+        self.x = x
+        self.y = y
+        self.left = left
+        self.right = right
+        self.size = 1 if left is None else left.size + right.size
+        self.upper = None
+        self.lower = None
+
+
+class DynamicHull:
+
+    # O(n log n): starts from the points xs, ys, if any
+    def __init__(self, xs=(), ys=()):
+        self.counts = {}
+        for point in zip(xs, ys):
+            self.counts[point] = self.counts.get(point, 0) + 1
+        self.root = self.build(sorted(self.counts), 0, len(self.counts)) if self.counts else None
+
+    # Number of points, repeats included
+    def __len__(self):
+        return sum(self.counts.values())
+
+    # O(log^3 n) amortized
+    def insert(self, x, y):
+        key = (x, y)
+        count = self.counts.get(key, 0)
+        self.counts[key] = count + 1
+        if count:
+            return
+        if self.root is None:
+            self.root = Node(x, y)
+            return
+
+        path = self.path(key)
+        leaf = path.pop()
+        if key < (leaf.x, leaf.y):
+            node = Node(x, y, Node(x, y), leaf)
+        else:
+            node = Node(leaf.x, leaf.y, leaf, Node(x, y))
+        self.update(node)
+        self.replace(path, leaf, node)
+        for ancestor in path:
+            ancestor.size += 1
+        self.rebalance(path)
+
+    # O(log^3 n) amortized; removes one copy of the point
+    def delete(self, x, y):
+        key = (x, y)
+        count = self.counts.get(key, 0)
+        if not count:
+            raise Exception('Point ({}, {}) is not in the hull'.format(x, y))
+        if count > 1:
+            self.counts[key] = count - 1
+            return
+        del self.counts[key]
+
+        path = self.path(key)
+        path.pop()
+        if not path:
+            self.root = None
+            return
+        parent = path.pop()
+        self.replace(path, parent, parent.right if key <= (parent.x, parent.y) else parent.left)
+        for ancestor in path:
+            ancestor.size -= 1
+        self.rebalance(path)
+
+    # Nodes from the root down to the leaf where key is or would be
+    def path(self, key):
+        node = self.root
+        path = [node]
+        while node.left is not None:
+            node = node.left if key <= (node.x, node.y) else node.right
+            path.append(node)
+        return path
+
+    # Puts node in the place of old, a child of the last node of path
+    def replace(self, path, old, node):
+        if not path:
+            self.root = node
+        elif path[-1].left is old:
+            path[-1].left = node
+        else:
+            path[-1].right = node
+
+    # Rebuilds the topmost subtree of path that is out of balance, then recomputes
+    # the bridges of the path above it, bottom up
+    def rebalance(self, path):
+        for depth, node in enumerate(path):
+            if node.size > 2 and max(node.left.size, node.right.size) > ALPHA * node.size:
+                del path[depth:]
+                self.replace(path, node, self.build(self.points(node), 0, node.size))
+                break
+        for node in reversed(path):
+            self.update(node)
+
+    # O(size): points of a subtree in increasing (x, y) order
+    def points(self, node):
+        points, stack = [], [node]
+        while stack:
+            node = stack.pop()
+            if node.left is None:
+                points.append((node.x, node.y))
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+        return points
+
+    # O(m log^2 m) at worst, O(m) for the bridges of a balanced tree: perfectly
+    # balanced subtree over points[start:stop]
+    def build(self, points, start, stop):
+        if stop - start == 1:
+            return Node(*points[start])
+        middle = (start + stop) // 2
+        node = Node(*points[middle - 1], self.build(points, start, middle), self.build(points, middle, stop))
+        self.update(node)
+        return node
+
+    def update(self, node):
+        node.size = node.left.size + node.right.size
+        node.upper = self.bridge(node.left, node.right, UPPER)
+        node.lower = self.bridge(node.left, node.right, LOWER)
+
+    # O(log n): the vertex of node's chain that the tangent from (px, py) touches, for a
+    # point before all of node's points in (x, y) order; the farthest one if several are
+    # collinear. A vertex hidden under a bridge can never beat both bridge ends, so each
+    # step only has to compare against the bridge.
+    def tangent(self, px, py, node, sign):
+        while node.left is not None:
+            cx, cy, dx, dy = node.upper if sign == UPPER else node.lower
+            node = node.right if sign * orient(px, py, cx, cy, dx, dy) <= 0 else node.left
+        return node.x, node.y
+
+    # O(log^2 n): bridge between the chains of two subtrees, left before right. The
+    # bridge of left's own children is an edge (a, b) of its chain, and b stays on the
+    # joined chain exactly when it still turns the chain's way towards its tangent on
+    # right; if so the bridge starts at b or after it, otherwise at a or before it.
+    def bridge(self, left, right, sign):
+        node = left
+        while node.left is not None:
+            ax, ay, bx, by = node.upper if sign == UPPER else node.lower
+            qx, qy = self.tangent(bx, by, right, sign)
+            node = node.right if sign * orient(ax, ay, bx, by, qx, qy) > 0 else node.left
+        return (node.x, node.y) + self.tangent(node.x, node.y, right, sign)
+
+    # O(h log n): chain as (x, y) points in increasing order
+    def chain(self, sign):
+        points = []
+        if self.root is not None:
+            self.walk(self.root, (-float('inf'), -float('inf')), (float('inf'), float('inf')), sign, points)
+        return points
+
+    # Appends the vertices of node's chain between low and high
+    def walk(self, node, low, high, sign, points):
+        if node.left is None:
+            if low <= (node.x, node.y) <= high:
+                points.append((node.x, node.y))
+            return
+        px, py, qx, qy = node.upper if sign == UPPER else node.lower
+        if low <= (px, py):
+            self.walk(node.left, low, min(high, (px, py)), sign, points)
+        if (qx, qy) <= high:
+            self.walk(node.right, max(low, (qx, qy)), high, sign, points)
+
+    # O(h log n): the current hull, over its own vertex coordinates
+    def hull(self):
+        upper, lower = self.chain(UPPER), self.chain(LOWER)
+        points = upper + lower[-2:0:-1]
+        return Hull([x for x, y in points], [y for x, y in points], range(len(points)), max(len(upper) - 1, 0))
+
+    # O(log n): a point maximizing dx * x + dy * y
+    def extreme(self, dx, dy):
+        if self.root is None:
+            raise Exception('An empty hull has no extreme point')
+        if dx == 0 and dy == 0:
+            raise Exception('Extreme point needs a nonzero direction')
+        node = self.root
+        if dy == 0:
+            while node.left is not None:
+                node = node.right if dx > 0 else node.left
+            return node.x, node.y
+        # Upward directions are decided on the upper chain, downward ones on the lower
+        while node.left is not None:
+            px, py, qx, qy = node.upper if dy > 0 else node.lower
+            node = node.right if dot_sign(dx, dy, px, py, qx, qy) > 0 else node.left
+        return node.x, node.y
@@ -0,0 +1,85 @@
+import threading
+from array import array
+
+# Record of a Show Recursion run for replay. Every observer call from the
+# solver (one per base case and merge) becomes one step holding the edge IDs it
+# erased and added, where an edge i -> j between point indices is the integer
+# i << 32 | j. The solver only appends, so it never waits on the GUI, and the
+# view replays steps at its own pace from its own thread.
+#
+# Steps live in a ring buffer of fixed capacity. When it is full the oldest
+# step is folded into a base edge set before being overwritten, so the edges
+# visible at any retained step can still be rebuilt, and memory stays bounded
+# however many points are solved.
+
+DEFAULT_CAPACITY = 1 << 16
+
+
+def edge_id(i, j):
+    return i << 32 | j
+
+
+def edge_points(edge):  # returns i, j
+    return edge >> 32, edge & 0xffffffff
+
+
+class EventLog:
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise Exception('EventLog capacity must be positive, got {}'.format(capacity))
+        self.capacity = capacity
+        self.steps = [None] * capacity
+        self.first = 0      # number of the oldest retained step
+        self.total = 0      # steps recorded so far
+        self.base = set()   # edges visible before step first
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.total
+
+    # O(k) for k edges; same signature as the compute_hull observer, with index pairs
+    def record(self, erased_edges, added_edges):
+        step = (array('q', [edge_id(i, j) for i, j in erased_edges]), array('q', [edge_id(i, j) for i, j in added_edges]))
+        with self.lock:
+            slot = self.total % self.capacity
+            if self.total - self.first == self.capacity:
+                erased, added = self.steps[slot]
+                self.base.difference_update(erased)
+                self.base.update(added)
+                self.first += 1
+            self.steps[slot] = step
+            self.total += 1
+
+    # O(steps moved): moves the set of visible edges from step current to step target
+    # in place, undoing steps when going back, and returns the step reached. Targets
+    # outside the retained range are clamped; a current step that has been overwritten
+    # since is rebuilt from the base set.
+    def seek(self, edges, current, target):
+        with self.lock:
+            target = max(self.first, min(target, self.total))
+            if current < self.first:
+                edges.clear()
+                edges.update(self.base)
+                current = self.first
+            while current < target:
+                erased, added = self.steps[current % self.capacity]
+                edges.difference_update(erased)
+                edges.update(added)
+                current += 1
+            while current > target:
+                current -= 1
+                erased, added = self.steps[current % self.capacity]
+                edges.difference_update(added)
+                edges.update(erased)
+            return target
+
+    # O(steps + k): appends one step from the edges visible after the last step to
+    # exactly edges (index pairs), unless the log already ends on them. Engines that
+    # solve parts of the input unobserved leave a log that stops short of their result.
+    def finish(self, edges):
+        target = set(edge_id(i, j) for i, j in edges)
+        visible = set()
+        self.seek(visible, self.first - 1, self.total)
+        if visible != target:
+            self.record([edge_points(edge) for edge in visible - target], [edge_points(edge) for edge in target - visible])
@@ -1,6 +1,136 @@
+from array import array
+
+from predicates import orient
+
+
 class Hull:
-    def __init__(self, lines=[]):
-        self.lines = lines
+    # A hull is an array('i') of vertex indices into shared coordinate buffers xs, ys,
+    # in clockwise order starting at the leftmost point. Edges are derived on demand
+    # rather than stored, and view() exposes the indices without copying them.
+    __slots__ = ('xs', 'ys', 'vertices', 'right_most_index', 'upper', 'lower')
+
+    def __init__(self, xs=(), ys=(), vertices=(), right_most_index=0):
+        self.xs = xs
+        self.ys = ys
+        self.vertices = array('i', vertices)
+        self.right_most_index = right_most_index
+
+        # Upper and lower chains, both in increasing (x, y) order, built on the first insert
+        self.upper = None
+        self.lower = None
+
+    def getVertices(self):
+        self.sync()
+        return self.vertices
+
+    def __len__(self):
+        self.sync()
+        return len(self.vertices)
+
+    # Zero-copy view of the vertex indices; NumPy consumers can wrap it with numpy.frombuffer
+    def view(self):
+        self.sync()
+        return memoryview(self.vertices)
+
+    def getPoints(self):
+        self.sync()
+        return [(self.xs[i], self.ys[i]) for i in self.vertices]
+
+    # Yields the clockwise edges as index pairs
+    def getEdges(self):
+        self.sync()
+        vertices = self.vertices
+        if len(vertices) < 2:
+            return
+        yield from zip(vertices, vertices[1:])
+        yield vertices[-1], vertices[0]
+
+    # O(h): rebuild the clockwise ring from the chains after inserts
+    def sync(self):
+        if self.upper is None or self.vertices is not None:
+            return
+        self.vertices = self.upper + self.lower[-2:0:-1]
+        self.right_most_index = max(len(self.upper) - 1, 0)
+
+    # O(h): the upper and lower chains of the ring, both in increasing (x, y) order
+    # from the leftmost vertex to the rightmost one, as slices of the vertex array
+    def chains(self):  # returns upper, lower
+        self.sync()
+        ring, right_most_index = self.vertices, self.right_most_index
+        upper = ring[:right_most_index + 1]
+        lower = ring[:1] + ring[right_most_index:][::-1] if right_most_index else ring[:1]
+        return upper, lower
+
+    # O(h): copy the hull's own coordinates out of the shared input buffers so new
+    # points can be appended, and split the ring into its two chains
+    def make_dynamic(self):
+        self.sync()
+        ring = self.vertices
+        self.xs = array('d', (self.xs[i] for i in ring))
+        self.ys = array('d', (self.ys[i] for i in ring))
+        self.vertices = array('i', range(len(ring)))
+        self.upper, self.lower = self.chains()
+
+    # Positive when c is left of a->b, see predicates.orient
+    def cross(self, a, b, c):
+        xs, ys = self.xs, self.ys
+        return orient(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c])
+
+    # O(log h) search + amortized O(1) repairs. sign is -1 for the upper chain
+    # (turns clockwise) and +1 for the lower chain (turns counter-clockwise).
+    def insert_into_chain(self, chain, point, sign):
+        xs, ys = self.xs, self.ys
+        key = (xs[point], ys[point])
+
+        # Binary search for the first vertex after point in (x, y) order
+        low, high = 0, len(chain)
+        while low < high:
+            middle = (low + high) // 2
+            if (xs[chain[middle]], ys[chain[middle]]) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        position = low
+
+        if position > 0 and (xs[chain[position - 1]], ys[chain[position - 1]]) == key:
+            return False
+        if 0 < position < len(chain) and sign * self.cross(chain[position - 1], chain[position], point) >= 0:
+            return False    # on or inside this chain
+
+        # Repair only the section around the new vertex
+        chain.insert(position, point)
+        while position >= 2 and sign * self.cross(chain[position - 2], chain[position - 1], point) <= 0:
+            del chain[position - 1]
+            position -= 1
+        while position + 2 < len(chain) and sign * self.cross(point, chain[position + 1], chain[position + 2]) <= 0:
+            del chain[position + 1]
+        return True
+
+    # O(log h) amortized; returns True if the point became a hull vertex
+    def insert(self, x, y):
+        if self.upper is None:
+            self.make_dynamic()
+
+        point = len(self.xs)
+        self.xs.append(x)
+        self.ys.append(y)
+        changed_upper = self.insert_into_chain(self.upper, point, -1)
+        changed_lower = self.insert_into_chain(self.lower, point, 1)
+        if not (changed_upper or changed_lower):
+            self.xs.pop()
+            self.ys.pop()
+            return False
+
+        self.vertices = None
+        # Points dropped from the chains are dead weight in xs, ys; compact once they dominate
+        if len(self.xs) > 2 * (len(self.upper) + len(self.lower)) + 64:
+            self.sync()
+            self.make_dynamic()
+        return True
 
-    def getLines(self):
-        return self.lines
+    # Inserts every (x, y) pair; returns how many of them changed the hull
+    def insert_many(self, points):
+        changed = 0
+        for x, y in points:
+            changed += self.insert(x, y)
+        return changed
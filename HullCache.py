@@ -0,0 +1,144 @@
+import hashlib
+import os
+import threading
+from array import array
+from collections import OrderedDict
+
+from Hull import Hull
+
+# Content-addressed cache of hull results. The key is a BLAKE2b digest of the
+# raw coordinate bytes plus the engine name and its options, so the same point
+# set solved again (the same seed in the GUI, an identical tile in a batch)
+# maps to the same entry no matter where it came from. Entries are the vertex
+# index array and right_most_index of the hull, which are valid for any copy of
+# the same coordinates. The memory tier is an LRU bounded by entry count and
+# bytes. With a directory every entry is also written to disk, and misses in
+# memory are looked up there before they count as misses.
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 64 << 20
+
+
+# O(n): the coordinates as bytes of C doubles, without copying if they already are
+def coordinate_bytes(values):
+    try:
+        view = memoryview(values)
+        if view.format == 'd' and view.c_contiguous:
+            return view
+    except TypeError:
+        pass
+    return memoryview(array('d', values))
+
+
+class HullCache:
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, directory=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+        self.entries = OrderedDict()    # key -> (vertices, right_most_index), least recently used first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    # O(n) hashing at memory speed: hex key for a point set solved by one engine with given options
+    def key(self, xs, ys, algorithm='', options=()):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(len(xs).to_bytes(8, 'little'))
+        digest.update(coordinate_bytes(xs))
+        digest.update(coordinate_bytes(ys))
+        digest.update(repr((algorithm, options)).encode())
+        return digest.hexdigest()
+
+    # O(1) in memory: (vertices, right_most_index), or None on a miss
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self.load(key)
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.remember(key, entry)
+            return entry
+
+    # O(h): stores a result in memory, and on disk if the cache has a directory
+    def put(self, key, vertices, right_most_index):
+        entry = (array('i', vertices), right_most_index)
+        with self.lock:
+            self.remember(key, entry)
+        if self.directory is not None:
+            self.save(key, entry)
+
+    # Caller holds the lock
+    def remember(self, key, entry):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= self.size(old)
+        self.entries[key] = entry
+        self.bytes += self.size(entry)
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            key, old = self.entries.popitem(last=False)
+            self.bytes -= self.size(old)
+            self.evictions += 1
+
+    def size(self, entry):
+        return entry[0].itemsize * len(entry[0])
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.hull')
+
+    # A file is right_most_index followed by the vertex indices, as native ints
+    def save(self, key, entry):
+        vertices, right_most_index = entry
+        temporary = self.path(key) + '.tmp'
+        with open(temporary, 'wb') as f:
+            array('i', [right_most_index]).tofile(f)
+            vertices.tofile(f)
+        os.replace(temporary, self.path(key))
+
+    def load(self, key):
+        if self.directory is None:
+            return None
+        data = array('i')
+        try:
+            with open(self.path(key), 'rb') as f:
+                data.frombytes(f.read())
+        except (OSError, ValueError):
+            return None
+        if not data:
+            return None
+        return data[1:], data[0]
+
+    # Hull of xs, ys from the cache, or from solver (and then cached) on a miss
+    def compute_hull(self, solver, xs, ys, algorithm='', options=()):  # returns hull
+        key = self.key(xs, ys, algorithm, options)
+        entry = self.get(key)
+        if entry is not None:
+            return Hull(xs, ys, *entry)
+        hull = solver.compute_hull(xs, ys)
+        self.put(key, hull.getVertices(), hull.right_most_index)
+        return hull
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'bytes': self.bytes, 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
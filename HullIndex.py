@@ -0,0 +1,287 @@
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+
+from predicates import orient, orient_array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Queries are answered in blocks of this many points, so that the temporaries of
+# every kernel stay in cache
+QUERY_BLOCK = 1 << 16
+
+# Point queries against a solved hull, for callers that test many points at a
+# time. The clockwise ring is split into its upper and lower chains, each kept as
+# coordinate arrays in increasing (x, y) order, so a query point's x finds the edge
+# above and below it by binary search in O(log h) instead of a scan of the h edges.
+#
+# The nearest point of the hull to a point outside it lies on an edge facing the
+# point (one it is strictly on the outer side of), and those edges form one run of
+# each chain: around the edge above or below the point when it is over the hull's x
+# range, a prefix of both chains when it is left of the hull and a suffix of both
+# when it is right of it. Along that run the distance to the point falls until the
+# first edge the point does not project beyond the end of, and only grows after it,
+# so three binary searches per chain find the nearest edge. Edges are numbered like
+# Hull.getEdges, edge e running from ring[e] to ring[e + 1].
+#
+# With NumPy every query takes arrays of xs, ys and runs as a few kernels per
+# binary search step; without it, the same searches run point by point.
+
+
+class HullIndex:
+
+    # O(h)
+    def __init__(self, hull):
+        xs, ys = hull.xs, hull.ys
+        self.size = len(hull)
+        upper, lower = hull.chains()
+
+        self.upper_xs, self.upper_ys = array('d', (xs[i] for i in upper)), array('d', (ys[i] for i in upper))
+        self.lower_xs, self.lower_ys = array('d', (xs[i] for i in lower)), array('d', (ys[i] for i in lower))
+        # Ring edge number of each chain edge: the upper chain runs with the ring, the lower one against it
+        self.upper_edges = list(range(len(upper) - 1))
+        self.lower_edges = [self.size - 1 - j for j in range(len(lower) - 1)]
+        self.bounds = (min(self.upper_xs), min(self.lower_ys), max(self.upper_xs), max(self.upper_ys)) if self.size else None
+
+        if np is not None:
+            self.upper_xs, self.upper_ys = np.frombuffer(self.upper_xs), np.frombuffer(self.upper_ys)
+            self.lower_xs, self.lower_ys = np.frombuffer(self.lower_xs), np.frombuffer(self.lower_ys)
+            self.upper_edges, self.lower_edges = np.array(self.upper_edges, dtype=np.int64), np.array(self.lower_edges, dtype=np.int64)
+
+            # Slabs between the x values of all inner vertices, each with the edge of both
+            # chains over it, so one binary search finds both edges. A point on a slab's
+            # left boundary gets the edges right of it, except for the vertical edge the
+            # lower chain can end with.
+            self.slabs = np.unique(np.concatenate((self.upper_xs[1:-1], self.lower_xs[1:-1])))
+            upper_slabs = np.searchsorted(self.upper_xs[1:-1], self.slabs, side='right')
+            lower_slabs = np.searchsorted(self.lower_xs[1:-1], self.slabs, side='right')
+            if len(self.slabs) and self.slabs[-1] == self.lower_xs[-1]:
+                lower_slabs[-1] -= 1
+            self.upper_slabs = np.concatenate(([0], upper_slabs))
+            self.lower_slabs = np.concatenate(([0], lower_slabs))
+
+    def __len__(self):
+        return self.size
+
+    # O(log h): the edge of each chain spanning x, found among the inner vertices so the
+    # ends clamp to the first and last edge. At a shared x the search side picks the
+    # non-vertical edge: the upper chain can start with a vertical edge, the lower
+    # chain can end with one.
+    def spanning_point(self, x):  # returns upper edge, lower edge
+        return bisect_right(self.upper_xs, x, 1, len(self.upper_xs) - 1) - 1, bisect_left(self.lower_xs, x, 1, len(self.lower_xs) - 1) - 1
+
+    def spanning(self, xs):  # returns upper edges, lower edges
+        slab = np.searchsorted(self.slabs, xs, side='right')
+        return self.upper_slabs[slab], self.lower_slabs[slab]
+
+    # O(m log h): True for every point inside the hull or on its boundary
+    def contains(self, xs, ys):
+        if np is None:
+            return [self.contains_point(x, y) for x, y in zip(xs, ys)]
+        xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+        inside = np.empty(len(xs), dtype=bool)
+        for start in range(0, len(xs), QUERY_BLOCK):
+            stop = start + QUERY_BLOCK
+            inside[start:stop] = self.contains_vectorized(xs[start:stop], ys[start:stop])
+        return inside
+
+    # O(log h)
+    def contains_point(self, x, y):
+        if self.size == 0:
+            return False
+        min_x, min_y, max_x, max_y = self.bounds
+        if not (min_x <= x <= max_x and min_y <= y <= max_y):
+            return False
+        if self.size < 3:
+            # A point or a segment: on it when collinear, the bounds did the rest
+            return self.size == 1 or orient(self.upper_xs[0], self.upper_ys[0], self.upper_xs[1], self.upper_ys[1], x, y) == 0
+
+        upper_xs, upper_ys, lower_xs, lower_ys = self.upper_xs, self.upper_ys, self.lower_xs, self.lower_ys
+        upper, lower = self.spanning_point(x)
+        if orient(upper_xs[upper], upper_ys[upper], upper_xs[upper + 1], upper_ys[upper + 1], x, y) > 0:
+            return False
+        return orient(lower_xs[lower], lower_ys[lower], lower_xs[lower + 1], lower_ys[lower + 1], x, y) >= 0
+
+    # O(m log h) kernels of contains
+    def contains_vectorized(self, xs, ys):
+        if self.size == 0:
+            return np.zeros(len(xs), dtype=bool)
+        min_x, min_y, max_x, max_y = self.bounds
+        inside = (min_x <= xs) & (xs <= max_x) & (min_y <= ys) & (ys <= max_y)
+        if self.size < 3:
+            if self.size == 2:
+                inside &= self.cross(self.upper_xs, self.upper_ys, np.zeros(len(xs), dtype=np.int64), xs, ys) == 0
+            return inside
+
+        upper, lower = self.spanning(xs)
+        inside &= self.cross(self.upper_xs, self.upper_ys, upper, xs, ys) <= 0
+        inside &= self.cross(self.lower_xs, self.lower_ys, lower, xs, ys) >= 0
+        return inside
+
+    # O(m): orientation of every point against edge j of a chain
+    def cross(self, chain_xs, chain_ys, j, xs, ys):
+        return orient_array(chain_xs[j], chain_ys[j], chain_xs[j + 1], chain_ys[j + 1], xs, ys)
+
+    # O(m log h): for every point the edge nearest to it and the distance to the hull.
+    # Points inside the hull or on it are at distance 0 and get edge -1; so do all
+    # points when the hull has no edges, except that the distance is then to its vertex.
+    def nearest(self, xs, ys):  # returns edges, distances
+        if np is None:
+            edges, distances = [], []
+            for x, y in zip(xs, ys):
+                edge, distance = self.nearest_point(x, y)
+                edges.append(edge)
+                distances.append(distance)
+            return edges, distances
+        xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+        edges, distances = np.empty(len(xs), dtype=np.int64), np.empty(len(xs))
+        for start in range(0, len(xs), QUERY_BLOCK):
+            stop = start + QUERY_BLOCK
+            edges[start:stop], distances[start:stop] = self.nearest_vectorized(xs[start:stop], ys[start:stop])
+        return edges, distances
+
+    def nearest_edge(self, xs, ys):
+        return self.nearest(xs, ys)[0]
+
+    def distance(self, xs, ys):
+        return self.nearest(xs, ys)[1]
+
+    # Positive when the point is strictly on the outer side of edge j of a chain,
+    # sign being 1 for the upper chain and -1 for the lower one. Scalars or arrays.
+    def facing(self, chain_xs, chain_ys, sign, j, xs, ys):
+        ax, ay = chain_xs[j], chain_ys[j]
+        return sign * ((chain_xs[j + 1] - ax) * (ys - ay) - (chain_ys[j + 1] - ay) * (xs - ax))
+
+    # True when the point projects beyond the far end of edge j of a chain
+    def past(self, chain_xs, chain_ys, j, xs, ys):
+        bx, by = chain_xs[j + 1], chain_ys[j + 1]
+        return (xs - bx) * (bx - chain_xs[j]) + (ys - by) * (by - chain_ys[j]) > 0
+
+    # O(1): distance from the point to edge j of a chain. Scalars or arrays.
+    def edge_distance(self, chain_xs, chain_ys, j, xs, ys):
+        ax, ay = chain_xs[j], chain_ys[j]
+        dx, dy = chain_xs[j + 1] - ax, chain_ys[j + 1] - ay
+        t = ((xs - ax) * dx + (ys - ay) * dy) / (dx * dx + dy * dy)
+        if np is not None:
+            t = np.clip(t, 0.0, 1.0)
+            return np.hypot(xs - ax - t * dx, ys - ay - t * dy)
+        t = min(max(t, 0.0), 1.0)
+        return math.hypot(xs - ax - t * dx, ys - ay - t * dy)
+
+    # O(log h): first j in [low, high) where test(j) is false, high if there is none;
+    # test has to hold on a prefix of the range
+    def search_point(self, low, high, test):
+        while low < high:
+            middle = (low + high) // 2
+            if test(middle):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    # O(log h)
+    def nearest_point(self, x, y):  # returns edge, distance
+        if self.size == 0:
+            return -1, math.inf
+        if self.size == 1:
+            return -1, math.hypot(x - self.upper_xs[0], y - self.upper_ys[0])
+        if self.contains_point(x, y):
+            return -1, 0.0
+        if self.size == 2:
+            return 0, self.edge_distance(self.upper_xs, self.upper_ys, 0, x, y)
+
+        # Over the hull's x range only the chain the point is outside of can hold its
+        # nearest point; beyond the range both can, with their runs starting at the
+        # first edge (left of the hull) or ending at the last one (right of it)
+        upper_xs, upper_ys, lower_xs, lower_ys = self.upper_xs, self.upper_ys, self.lower_xs, self.lower_ys
+        if x < self.bounds[0]:
+            upper, lower = 0, 0
+        elif x > self.bounds[2]:
+            upper, lower = len(upper_xs) - 2, len(lower_xs) - 2
+        else:
+            upper, lower = self.spanning_point(x)
+            if orient(upper_xs[upper], upper_ys[upper], upper_xs[upper + 1], upper_ys[upper + 1], x, y) > 0:
+                lower = None
+            else:
+                upper = None
+
+        nearest = -1, math.inf
+        if upper is not None:
+            j, distance = self.chain_nearest_point(upper_xs, upper_ys, 1, x, y, upper)
+            nearest = self.upper_edges[j], distance
+        if lower is not None:
+            j, distance = self.chain_nearest_point(lower_xs, lower_ys, -1, x, y, lower)
+            if distance < nearest[1]:
+                nearest = self.lower_edges[j], distance
+        return nearest
+
+    # O(log h): the edge of a chain nearest to a point outside the hull and the distance
+    # to it. spanning is an edge of the run of facing edges if there is one: the spanning
+    # edge over the hull, the first edge left of it, the last edge right of it. With no
+    # run (rounding at the boundary, or a point beyond the hull this chain does not face)
+    # it is the answer, an upper bound at worst.
+    def chain_nearest_point(self, chain_xs, chain_ys, sign, x, y, spanning):  # returns edge, distance
+        facing = lambda j: self.facing(chain_xs, chain_ys, sign, j, x, y) > 0
+        low = self.search_point(0, spanning, lambda j: not facing(j))
+        high = self.search_point(spanning, len(chain_xs) - 1, facing)
+        if low >= high:
+            return spanning, self.edge_distance(chain_xs, chain_ys, spanning, x, y)
+        j = self.search_point(low, high - 1, lambda j: self.past(chain_xs, chain_ys, j, x, y))
+        return j, self.edge_distance(chain_xs, chain_ys, j, x, y)
+
+    # O(log h) kernels per step: search_point for every point in lockstep, over arrays low, high
+    def search(self, low, high, test):
+        for step in range(int(np.max(high - low, initial=0)).bit_length()):
+            searching = low < high
+            middle = np.where(searching, (low + high) // 2, 0)
+            passed = test(middle)
+            low = np.where(searching & passed, middle + 1, low)
+            high = np.where(searching & ~passed, middle, high)
+        return low
+
+    # O(m log h) kernels of nearest
+    def nearest_vectorized(self, xs, ys):
+        edges = np.full(len(xs), -1, dtype=np.int64)
+        if self.size == 0:
+            return edges, np.full(len(xs), np.inf)
+        if self.size == 1:
+            return edges, np.hypot(xs - self.upper_xs[0], ys - self.upper_ys[0])
+
+        outside = np.flatnonzero(~self.contains_vectorized(xs, ys))
+        distances = np.zeros(len(xs))
+        xs, ys = xs[outside], ys[outside]
+        if self.size == 2:
+            edges[outside] = 0
+            distances[outside] = self.edge_distance(self.upper_xs, self.upper_ys, 0, xs, ys)
+            return edges, distances
+
+        upper_xs, upper_ys, lower_xs, lower_ys = self.upper_xs, self.upper_ys, self.lower_xs, self.lower_ys
+        left, right = xs < self.bounds[0], xs > self.bounds[2]
+        upper, lower = self.spanning(xs)
+        upper[left], lower[left] = 0, 0
+        upper[right], lower[right] = len(upper_xs) - 2, len(lower_xs) - 2
+        above = self.cross(upper_xs, upper_ys, upper, xs, ys) > 0
+        beyond = left | right
+
+        nearest_edges, nearest_distances = np.full(len(xs), -1, dtype=np.int64), np.full(len(xs), np.inf)
+        for chain_xs, chain_ys, sign, spanning, chain_edges, points in (
+                (upper_xs, upper_ys, 1, upper, self.upper_edges, np.flatnonzero(beyond | above)),
+                (lower_xs, lower_ys, -1, lower, self.lower_edges, np.flatnonzero(beyond | ~above))):
+            j, chain_distances = self.chain_nearest_vectorized(chain_xs, chain_ys, sign, xs[points], ys[points], spanning[points])
+            nearer = chain_distances < nearest_distances[points]
+            nearest_edges[points[nearer]] = chain_edges[j[nearer]]
+            nearest_distances[points[nearer]] = chain_distances[nearer]
+        edges[outside], distances[outside] = nearest_edges, nearest_distances
+        return edges, distances
+
+    # O(m log h) kernels of chain_nearest_point
+    def chain_nearest_vectorized(self, chain_xs, chain_ys, sign, xs, ys, spanning):  # returns edges, distances
+        facing = lambda j: self.facing(chain_xs, chain_ys, sign, j, xs, ys) > 0
+        low = self.search(np.zeros(len(xs), dtype=np.int64), spanning, lambda j: ~facing(j))
+        high = self.search(spanning, np.full(len(xs), len(chain_xs) - 1, dtype=np.int64), facing)
+        j = self.search(low, np.maximum(high - 1, low), lambda j: self.past(chain_xs, chain_ys, j, xs, ys))
+        j = np.where(low < high, j, spanning)
+        return j, self.edge_distance(chain_xs, chain_ys, j, xs, ys)
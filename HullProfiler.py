@@ -0,0 +1,101 @@
+import json
+import time
+
+# Optional instrumentation for the divide and conquer engines. A solver built
+# with ConvexHullSolver(profiler=HullProfiler()) reports its presort and
+# recursion times, and for every merge the time of each tangent walk and of
+# the splice, how far the tangents lie from where the walks start, the vertices
+# dropped and the merged size, all by recursion depth. Without a profiler the
+# solver only pays one None check per merge.
+#
+# Results export as JSON, and as collapsed stacks ("frame;frame;frame value"
+# lines, microseconds) that flamegraph.pl, speedscope and similar tools read.
+
+MERGE_PHASES = ('find_upper_tangent', 'find_lower_tangent', 'splice')
+
+
+class HullProfiler:
+
+    def __init__(self):
+        self.presort_time = 0.0
+        self.ring_time = 0.0
+        self.depth = 0      # depth of the merges being done, kept by compute_ring
+        self.depths = {}    # depth -> per depth totals, see merged
+
+    def clock(self):
+        return time.perf_counter()
+
+    def depth_totals(self, depth):
+        totals = self.depths.get(depth)
+        if totals is None:
+            totals = self.depths[depth] = {
+                'merges': 0, 'points': 0, 'largest': 0, 'tangent_distance': 0, 'deleted': 0,
+                'find_upper_tangent': 0.0, 'find_lower_tangent': 0.0, 'splice': 0.0}
+        return totals
+
+    # Called by merge_runs with the two ring sizes, the tangent positions it found and its four clock readings
+    def merged(self, left, left_right_most, right, left_top, right_top, left_bottom, right_bottom, size, t1, t2, t3, t4):
+        totals = self.depth_totals(self.depth)
+        totals['merges'] += 1
+        totals['points'] += left + right
+        totals['largest'] = max(totals['largest'], left + right)
+        # How far each tangent point is from where its walk starts (the right ring's left
+        # end, the left ring's right_most), counted along the ring in the walk's direction.
+        # Up to WALK_STEPS on each ring that is the steps walked; beyond it the walk hands
+        # over to find_bridge, whose search takes O(log h) steps for the rest.
+        totals['tangent_distance'] += ((left_right_most - left_top) % left + right_top
+                                       + (left_bottom - left_right_most) % left + (-right_bottom) % right)
+        totals['deleted'] += left + right - size
+        totals['find_upper_tangent'] += t2 - t1
+        totals['find_lower_tangent'] += t3 - t2
+        totals['splice'] += t4 - t3
+
+    def total(self, name):
+        return sum(totals[name] for totals in self.depths.values())
+
+    def to_dict(self):
+        merge_time = sum(self.total(phase) for phase in MERGE_PHASES)
+        return {
+            'timers': {
+                'presort': self.presort_time,
+                'compute_ring': self.ring_time,
+                'base_cases_and_recursion': max(self.ring_time - merge_time, 0.0),
+                'find_upper_tangent': self.total('find_upper_tangent'),
+                'find_lower_tangent': self.total('find_lower_tangent'),
+                'splice': self.total('splice'),
+            },
+            'counters': {name: self.total(name) for name in ('merges', 'tangent_distance', 'deleted')},
+            'depths': [dict(depth=depth, **self.depths[depth]) for depth in sorted(self.depths)],
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=1)
+
+    # Collapsed stacks, one line per leaf frame with its time in microseconds
+    def collapsed(self):
+        lines = []
+        if self.presort_time:
+            lines.append('compute_hull;sort_points_by_x {}'.format(round(self.presort_time * 1e6)))
+        merge_time = 0.0
+        for depth in sorted(self.depths):
+            totals = self.depths[depth]
+            for phase in MERGE_PHASES:
+                merge_time += totals[phase]
+                lines.append('compute_hull;compute_ring;depth {};combine_hulls;{} {}'.format(depth, phase, round(totals[phase] * 1e6)))
+        if self.ring_time:
+            lines.append('compute_hull;compute_ring {}'.format(round(max(self.ring_time - merge_time, 0.0) * 1e6)))
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        with open(path + '.json', 'w') as f:
+            f.write(self.to_json())
+        with open(path + '.folded', 'w') as f:
+            f.write(self.collapsed())
+
+    # One line for the GUI status bar
+    def summary(self):
+        report = self.to_dict()
+        timers, counters = report['timers'], report['counters']
+        return 'presort {:.3f}s, tangents {:.3f}s, splice {:.3f}s, {} merges, {} tangent distance, {} points deleted, {} merge levels'.format(
+            timers['presort'], timers['find_upper_tangent'] + timers['find_lower_tangent'], timers['splice'],
+            counters['merges'], counters['tangent_distance'], counters['deleted'], len(report['depths']))
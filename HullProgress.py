@@ -0,0 +1,61 @@
+import time
+
+# Seconds between two progress reports
+REPORT_INTERVAL = 0.1
+
+# Merges below this level are too small to check in at; a merge of level L covers
+# 3 * 2^L points or so, which keeps the checks to a few per thousand points
+CHECK_LEVEL = 3
+
+# Cooperative cancellation, progress reports and time budgets for the divide and
+# conquer engines. A solver built with ConvexHullSolver(progress=HullProgress())
+# checks in with merged() after the larger merges of its top level compute_ring,
+# which reports the fraction of merges done at most every REPORT_INTERVAL seconds.
+#
+# cancel() may be called from any thread; the solver notices at its next check and
+# raises HullCancelled. With a budget in seconds, the first check after it runs out
+# stops taking in points: the runs merged so far are merged with each other and
+# returned, which is the exact hull of the leftmost covered points in sorted order
+# rather than of all of them.
+
+
+class HullCancelled(Exception):
+    pass
+
+
+class HullProgress:
+
+    # report, if given, is called as report(fraction) from the solving thread
+    def __init__(self, report=None, budget=None, interval=REPORT_INTERVAL):
+        self.report = report
+        self.budget = budget
+        self.interval = interval
+        self.cancelled = False
+        self.start()
+
+    # Restarts the budget and the counts; the budget runs from here, not from the first merge
+    def start(self):
+        now = time.perf_counter()
+        self.deadline = now + self.budget if self.budget is not None else None
+        self.next_report = now + self.interval
+        self.done = 0
+        self.total = 0
+        self.covered = None     # points the hull covers, set by compute_ring when the budget cut it short
+
+    def cancel(self):
+        self.cancelled = True
+
+    def fraction(self):
+        return self.done / self.total if self.total else 0.0
+
+    # Called by compute_ring with the merges done and the merges it needs in all;
+    # returns True once the budget has run out
+    def merged(self, done, total):
+        if self.cancelled:
+            raise HullCancelled('Hull computation cancelled after {} of {} merges'.format(done, total))
+        self.done, self.total = done, total
+        now = time.perf_counter()
+        if self.report is not None and now >= self.next_report:
+            self.next_report = now + self.interval
+            self.report(done / total)
+        return self.deadline is not None and now >= self.deadline
@@ -0,0 +1,460 @@
+#!/usr/bin/python3
+# Local hull service for other processes, so they do not start an interpreter
+# and import PyQt per request. Like ConvexHullSolverThread does for the GUI, it
+# wraps the engines in solvers.py, here behind an asyncio server on a Unix
+# socket (or a localhost TCP port) with a pool of warm worker processes.
+#
+#   python3 HullServer.py                              # serves on /tmp/convexhull.sock
+#   python3 HullServer.py --port 8765 --workers 4 --engine "NumPy Quickhull"
+#
+# Every message is a frame: a 16 byte header (kind, request id, payload size;
+# little-endian '<4sIQ') and the payload. Requests:
+#
+#   FLAT  groups G (uint64), G + 1 offsets (int64), then the N = offsets[G] x
+#         coordinates and the N y coordinates (float64). Group g is points
+#         offsets[g] .. offsets[g + 1], as for BatchHullSolver.compute_hulls.
+#   FILE  a whole point file as written by PointFile.write_points, one group.
+#   STAT  no payload; answered with the server statistics as JSON.
+#
+# Answers carry the id of their request and are sent as soon as they are
+# ready, so a client may pipeline requests and get them back out of order:
+#
+#   HULL  groups G (uint64), G + 1 hull offsets, the hull vertices as indices
+#         into the request's points, and G right_most_index values (int64)
+#   ERR!  a UTF-8 error message
+#   STAT  UTF-8 JSON
+#
+# Requests wait in one queue. At most one job per worker is in flight, so while
+# the pool is busy small requests pile up and the next job takes them all
+# (up to BATCH_POINTS points) into a single BatchHullSolver call. Requests with
+# a group of more than SMALL_GROUP points are solved on their own by the engine.
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import socket
+import struct
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from BatchHullSolver import BatchHullSolver
+from PointFile import PointFile, coordinate_block
+from solvers import SOLVERS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FRAME = struct.Struct('<4sIQ')
+COUNT = struct.Struct('<Q')
+
+DEFAULT_SOCKET = '/tmp/convexhull.sock'
+
+# Requests with a larger group are not batched
+SMALL_GROUP = 5000
+
+# Most points coalesced into one batch
+BATCH_POINTS = 1 << 20
+
+# Latencies kept for the percentiles
+LATENCY_WINDOW = 10000
+
+
+# O(n): array of typecode from little-endian bytes
+def little_endian(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+# O(n): int64 array('q') of BatchHullSolver output, which is NumPy arrays when NumPy is there
+def int_array(values):
+    if isinstance(values, array):
+        return values
+    result = array('q')
+    result.frombytes(np.ascontiguousarray(values, dtype=np.int64).tobytes())
+    return result
+
+
+def check_offsets(offsets, n):
+    if not offsets or offsets[0] != 0 or offsets[-1] != n or any(offsets[g] > offsets[g + 1] for g in range(len(offsets) - 1)):
+        raise Exception('Offsets must rise from 0 to the number of points ({})'.format(n))
+
+
+# O(n): xs, ys and offsets of a FLAT payload
+def parse_flat(payload):
+    if len(payload) < COUNT.size:
+        raise Exception('FLAT payload too short')
+    groups, = COUNT.unpack_from(payload)
+    coordinates = COUNT.size + 8 * (groups + 1)
+    if len(payload) < coordinates:
+        raise Exception('FLAT payload too short for {} groups'.format(groups))
+    offsets = little_endian('q', payload[COUNT.size:coordinates]).tolist()
+    n = offsets[-1]
+    if n < 0 or len(payload) != coordinates + 16 * n:
+        raise Exception('FLAT payload of {} bytes does not hold {} points'.format(len(payload), n))
+    check_offsets(offsets, n)
+    return little_endian('d', payload[coordinates:coordinates + 8 * n]), little_endian('d', payload[coordinates + 8 * n:]), offsets
+
+
+# O(n): xs, ys and offsets of a FILE payload, as one group
+def parse_file(payload):
+    with PointFile(data=payload) as points:
+        if points.dtype == 'd' and isinstance(points.xs, memoryview):
+            xs, ys = array('d'), array('d')
+            with points.xs.cast('B') as data:
+                xs.frombytes(data)
+            with points.ys.cast('B') as data:
+                ys.frombytes(data)
+        else:
+            xs, ys = array('d', points.xs), array('d', points.ys)
+    return xs, ys, [0, len(xs)]
+
+
+def flat_payload(xs, ys, offsets):
+    return b''.join((COUNT.pack(len(offsets) - 1), coordinate_block(offsets, 'q'), coordinate_block(xs, 'd'), coordinate_block(ys, 'd')))
+
+
+def hull_payload(vertices, hull_offsets, right_most_indices):
+    return b''.join((COUNT.pack(len(right_most_indices)), coordinate_block(hull_offsets, 'q'),
+                     coordinate_block(vertices, 'q'), coordinate_block(right_most_indices, 'q')))
+
+
+# O(h): vertices, hull_offsets, right_most_indices of a HULL payload
+def parse_hull(payload):
+    groups, = COUNT.unpack_from(payload)
+    vertices_start = COUNT.size + 8 * (groups + 1)
+    hull_offsets = little_endian('q', payload[COUNT.size:vertices_start])
+    vertices_stop = vertices_start + 8 * hull_offsets[-1]
+    return little_endian('q', payload[vertices_start:vertices_stop]), hull_offsets, little_endian('q', payload[vertices_stop:])
+
+
+# Runs in a worker: small groups of one or more requests in a single call
+def solve_batch(xs, ys, offsets):  # returns vertices, hull_offsets, right_most_indices
+    vertices, hull_offsets, right_most_indices = BatchHullSolver().compute_hulls(xs, ys, offsets)
+    return int_array(vertices), int_array(hull_offsets), int_array(right_most_indices)
+
+
+# Runs in a worker: the groups of one request solved one by one by the named engine
+def solve_groups(algorithm, xs, ys, offsets):  # returns vertices, hull_offsets, right_most_indices
+    engine = SOLVERS[algorithm]
+    solver = engine()
+    vertices, hull_offsets, right_most_indices = array('q'), array('q', [0]), array('q')
+    for start, stop in zip(offsets, offsets[1:]):
+        if engine.vectorized and np is not None:
+            hull = solver.compute_hull(np.frombuffer(xs, np.float64)[start:stop], np.frombuffer(ys, np.float64)[start:stop])
+        else:
+            hull = solver.compute_hull(xs[start:stop].tolist(), ys[start:stop].tolist())
+        vertices.extend(start + i for i in hull.getVertices())
+        hull_offsets.append(len(vertices))
+        right_most_indices.append(hull.right_most_index)
+    return vertices, hull_offsets, right_most_indices
+
+
+# Pool initializer: the imports are done by loading this module, one small solve warms the rest
+def warm_worker():
+    solve_batch(array('d', [0.0, 1.0, 0.0]), array('d', [0.0, 0.0, 1.0]), [0, 3])
+
+
+class Job:
+
+    def __init__(self, request_id, xs, ys, offsets):
+        self.request_id = request_id
+        self.xs = xs
+        self.ys = ys
+        self.offsets = offsets
+        self.largest = max((offsets[g + 1] - offsets[g] for g in range(len(offsets) - 1)), default=0)
+        self.received = time.perf_counter()
+        self.future = asyncio.get_running_loop().create_future()
+
+    def __len__(self):
+        return len(self.xs)
+
+
+class HullServer:
+
+    def __init__(self, path=DEFAULT_SOCKET, port=None, workers=None, algorithm='Divide and Conquer', batch_points=BATCH_POINTS):
+        self.path = path
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.algorithm = algorithm
+        self.batch_points = batch_points
+
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.coalesced = 0      # requests that shared a batch with others
+        self.points = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    async def start(self):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker)
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(self.workers)
+        self.held = None
+        self.dispatcher = asyncio.ensure_future(self.dispatch())
+        if self.port is not None:
+            self.server = await asyncio.start_server(self.connection, '127.0.0.1', self.port)
+        else:
+            if os.path.exists(self.path):
+                os.remove(self.path)    # stale socket of an earlier run
+            self.server = await asyncio.start_unix_server(self.connection, path=self.path)
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.dispatcher.cancel()
+        self.pool.shutdown()
+        if self.port is None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    # One client: reads frames until it hangs up, answers each request once its job is done
+    async def connection(self, reader, writer):
+        replies = set()
+        try:
+            while True:
+                kind, request_id, size = FRAME.unpack(await reader.readexactly(FRAME.size))
+                payload = await reader.readexactly(size)
+                if kind == b'STAT':
+                    self.send(writer, b'STAT', request_id, json.dumps(self.stats()).encode())
+                    continue
+
+                self.requests += 1
+                try:
+                    if kind == b'FLAT':
+                        xs, ys, offsets = parse_flat(payload)
+                    elif kind == b'FILE':
+                        xs, ys, offsets = parse_file(payload)
+                    else:
+                        raise Exception('Unknown request kind {!r}'.format(kind))
+                except Exception as e:
+                    self.errors += 1
+                    self.send(writer, b'ERR!', request_id, str(e).encode())
+                    continue
+
+                job = Job(request_id, xs, ys, offsets)
+                self.queue.put_nowait(job)
+                self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+                reply = asyncio.ensure_future(self.reply(writer, job))
+                replies.add(reply)
+                reply.add_done_callback(replies.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if replies:
+                await asyncio.wait(replies)
+            writer.close()
+
+    def send(self, writer, kind, request_id, payload):
+        writer.write(FRAME.pack(kind, request_id, len(payload)) + payload)
+
+    async def reply(self, writer, job):
+        try:
+            result = await job.future
+        except Exception as e:
+            self.errors += 1
+            self.send(writer, b'ERR!', job.request_id, str(e).encode())
+        else:
+            self.send(writer, b'HULL', job.request_id, hull_payload(*result))
+        self.latencies.append(time.perf_counter() - job.received)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    # Takes jobs off the queue as workers free up, coalescing the small ones waiting
+    async def dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.slots.acquire()
+            job, self.held = self.held, None
+            if job is None:
+                job = await self.queue.get()
+            if job.largest > SMALL_GROUP:
+                self.submit(loop.run_in_executor(self.pool, solve_groups, self.algorithm, job.xs, job.ys, job.offsets), [job])
+                continue
+
+            jobs, points = [job], len(job)
+            while points < self.batch_points and not self.queue.empty():
+                waiting = self.queue.get_nowait()
+                if waiting.largest > SMALL_GROUP:
+                    self.held = waiting     # goes next, on its own
+                    break
+                jobs.append(waiting)
+                points += len(waiting)
+
+            if len(jobs) == 1:
+                xs, ys, offsets = job.xs, job.ys, job.offsets
+            else:
+                xs, ys, offsets = array('d'), array('d'), [0]
+                for batched in jobs:
+                    offsets.extend(len(xs) + offset for offset in batched.offsets[1:])
+                    xs.extend(batched.xs)
+                    ys.extend(batched.ys)
+                self.coalesced += len(jobs)
+            self.submit(loop.run_in_executor(self.pool, solve_batch, xs, ys, offsets), jobs)
+
+    def submit(self, future, jobs):
+        self.batches += 1
+        self.in_flight += 1
+        self.points += sum(len(job) for job in jobs)
+        future.add_done_callback(lambda future: self.finished(future, jobs))
+
+    # O(h): hands each job its part of a batch result, with indices back into its own points
+    def finished(self, future, jobs):
+        self.in_flight -= 1
+        self.slots.release()
+        if future.exception() is not None:
+            for job in jobs:
+                job.future.set_exception(future.exception())
+            return
+
+        vertices, hull_offsets, right_most_indices = future.result()
+        if len(jobs) == 1:
+            jobs[0].future.set_result((vertices, hull_offsets, right_most_indices))
+            return
+        group, base = 0, 0
+        for job in jobs:
+            groups = len(job.offsets) - 1
+            first, last = hull_offsets[group], hull_offsets[group + groups]
+            job.future.set_result((array('q', (vertex - base for vertex in vertices[first:last])),
+                                   array('q', (offset - first for offset in hull_offsets[group:group + groups + 1])),
+                                   right_most_indices[group:group + groups]))
+            group += groups
+            base += len(job)
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+
+        # Nearest rank percentile in milliseconds
+        def percentile(p):
+            if not latencies:
+                return None
+            return 1e3 * latencies[max(math.ceil(p / 100 * len(latencies)) - 1, 0)]
+
+        return {
+            'queue_depth': self.queue.qsize() + (self.held is not None),
+            'max_queue_depth': self.max_queue_depth,
+            'in_flight': self.in_flight,
+            'workers': self.workers,
+            'requests': self.requests,
+            'errors': self.errors,
+            'batches': self.batches,
+            'coalesced': self.coalesced,
+            'points': self.points,
+            'latency_ms': {'p50': percentile(50), 'p90': percentile(90), 'p99': percentile(99), 'max': percentile(100)},
+        }
+
+
+# Blocking client for the protocol above. submit and receive may be used to
+# pipeline several requests; answers come back in the order they finish.
+class HullClient:
+
+    def __init__(self, path=DEFAULT_SOCKET, port=None):
+        if port is not None:
+            self.socket = socket.create_connection(('127.0.0.1', port))
+        else:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(path)
+        self.next_id = 0
+
+    def send(self, kind, payload=b''):  # returns the request id
+        self.next_id += 1
+        self.socket.sendall(FRAME.pack(kind, self.next_id, len(payload)) + payload)
+        return self.next_id
+
+    def receive_exactly(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.socket.recv(size - len(data))
+            if not chunk:
+                raise Exception('Hull server closed the connection')
+            data += chunk
+        return bytes(data)
+
+    # Returns (request id, result): (vertices, hull_offsets, right_most_indices) for a hull
+    # request, a dict for STAT. Raises on ERR!
+    def receive(self):
+        kind, request_id, size = FRAME.unpack(self.receive_exactly(FRAME.size))
+        payload = self.receive_exactly(size)
+        if kind == b'ERR!':
+            raise Exception('Hull request {} failed: {}'.format(request_id, payload.decode()))
+        if kind == b'STAT':
+            return request_id, json.loads(payload.decode())
+        return request_id, parse_hull(payload)
+
+    def submit(self, xs, ys, offsets):
+        return self.send(b'FLAT', flat_payload(xs, ys, offsets))
+
+    def submit_file(self, path):
+        with open(path, 'rb') as f:
+            return self.send(b'FILE', f.read())
+
+    def compute_hulls(self, xs, ys, offsets):  # returns vertices, hull_offsets, right_most_indices
+        self.submit(xs, ys, offsets)
+        return self.receive()[1]
+
+    def compute_hull(self, xs, ys):  # returns vertices, right_most_index
+        vertices, hull_offsets, right_most_indices = self.compute_hulls(xs, ys, [0, len(xs)])
+        return vertices, right_most_indices[0]
+
+    def stats(self):
+        self.send(b'STAT')
+        return self.receive()[1]
+
+    def close(self):
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+async def serve(args):
+    server = HullServer(args.socket, args.port, args.workers, args.engine)
+    await server.start()
+    print('Serving {} hulls on {} with {} workers'.format(
+        args.engine, args.socket if args.port is None else '127.0.0.1:{}'.format(args.port), server.workers))
+    sys.stdout.flush()
+
+    # Runs until SIGINT or SIGTERM, then lets the pool finish and removes the socket
+    stop = asyncio.Event()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(signal_number, stop.set)
+    try:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), args.report)
+            except asyncio.TimeoutError:
+                print(json.dumps(server.stats()))
+                sys.stdout.flush()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve convex hulls to local processes.')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='Unix socket path (default {})'.format(DEFAULT_SOCKET))
+    parser.add_argument('--port', type=int, help='listen on this localhost TCP port instead of a Unix socket')
+    parser.add_argument('--workers', type=int, help='worker processes (default one per CPU)')
+    parser.add_argument('--engine', default='Divide and Conquer', choices=list(SOLVERS), help='engine for requests too big to batch')
+    parser.add_argument('--report', type=float, default=10.0, help='seconds between statistics lines (default 10)')
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import numpy as np
+
+from Hull import Hull
+from predicates import orient, orient_array
+
+# Vectorized engine for large inputs. Interior points are thrown away in bulk
+# with the Akl-Toussaint quadrilateral (leftmost, top, rightmost, bottom), then
+# quickhull runs on what is left, each step being one cross-product kernel over
+# the candidate array. The result is the same clockwise ring starting at the
+# leftmost point that ConvexHullSolver produces, as indices into xs, ys.
+
+class NumpyHullSolver:
+
+    # Takes NumPy coordinate arrays as they are, without going through Python lists
+    vectorized = True
+
+    # Quickhull needs no presort
+    def sort_points_by_x(self, xs, ys):
+        return None
+
+    # O(n): contiguous float arrays, copied only if the input is not one already
+    def as_arrays(self, xs, ys):
+        return np.ascontiguousarray(xs, dtype=np.float64), np.ascontiguousarray(ys, dtype=np.float64)
+
+    # O(k): cross product of (b - a) and (p - a) for every candidate index p.
+    # Positive means p is left of a->b, which is outside a clockwise hull edge.
+    # span is the (width, height) of the input's bounding box, for one error bound
+    # per kernel. Entries decided exactly keep a tiny magnitude, so they never win
+    # the farthest point search.
+    def cross(self, xs, ys, a, b, candidates, span):
+        return orient_array(xs[a], ys[a], xs[b], ys[b], xs[candidates], ys[candidates], span)
+
+    # O(k): the tied candidate whose other coordinate is picked by arg (np.argmin or np.argmax)
+    def extreme(self, values, candidates, arg):
+        return int(candidates[arg(values[candidates])])
+
+    # O(k)
+    def outside(self, xs, ys, a, b, candidates, span):
+        return candidates[self.cross(xs, ys, a, b, candidates, span) > 0]
+
+    # O(n) filter + O(n log h) expected quickhull
+    def compute_hull(self, xs, ys, order=None, observer=None):  # returns hull; order and observer are accepted for interface compatibility only
+        xs, ys = self.as_arrays(xs, ys)
+        n = len(xs)
+        if n < 2:
+            return Hull(xs, ys, list(range(n)))
+
+        # Akl-Toussaint filter: every point strictly inside the extreme quadrilateral
+        # is dropped, and what survives is already split by the quadrilateral edge it lies beyond.
+        # Ties are broken so each corner is a true vertex: leftmost lowest, topmost leftmost,
+        # rightmost highest and bottommost rightmost, matching the clockwise walk.
+        left = self.extreme(ys, np.flatnonzero(xs == xs.min()), np.argmin)
+        top = self.extreme(xs, np.flatnonzero(ys == ys.max()), np.argmin)
+        right = self.extreme(ys, np.flatnonzero(xs == xs.max()), np.argmax)
+        bottom = self.extreme(xs, np.flatnonzero(ys == ys.min()), np.argmax)
+        span = (xs[right] - xs[left], ys[top] - ys[bottom])
+        everything = np.arange(n)
+        quadrilateral = [left, top, right, bottom]
+        segments = []
+        for i in range(4):
+            a, b = quadrilateral[i], quadrilateral[(i + 1) % 4]
+            if a != b:
+                segments.append((a, b, self.outside(xs, ys, a, b, everything, span)))
+
+        # Quickhull with an explicit stack so deep hulls cannot hit the recursion limit.
+        # Popping a segment without candidates emits its start point, which keeps the ring in order.
+        ring = []
+        stack = segments[::-1]
+        while stack:
+            a, b, candidates = stack.pop()
+            if len(candidates) == 0:
+                ring.append(a)
+                continue
+            far = int(candidates[np.argmax(self.cross(xs, ys, a, b, candidates, span))])
+            stack.append((far, b, self.outside(xs, ys, far, b, candidates, span)))
+            stack.append((a, far, self.outside(xs, ys, a, far, candidates, span)))
+
+        if not ring:
+            ring = [left]
+        ring = self.strictly_convex(xs, ys, ring)
+
+        return Hull(xs, ys, ring, ring.index(right) if right in ring else 0)
+
+    # O(h): ring without the vertices that do not turn clockwise. The farthest point
+    # search breaks ties (and float near ties) arbitrarily, so a point in the middle of
+    # a hull edge can end up in the ring; ConvexHullSolver drops those. ring[0] is the
+    # leftmost lowest point, always a true vertex.
+    def strictly_convex(self, xs, ys, ring):
+        kept = []
+        for v in ring:
+            while len(kept) > 1 and orient(xs[kept[-2]], ys[kept[-2]], xs[kept[-1]], ys[kept[-1]], xs[v], ys[v]) >= 0:
+                kept.pop()
+            kept.append(v)
+        # Back to ring[0]; a ring of two is a segment, whose ends both stay
+        first = kept[0]
+        while len(kept) > 2 and orient(xs[kept[-2]], ys[kept[-2]], xs[kept[-1]], ys[kept[-1]], xs[first], ys[first]) >= 0:
+            kept.pop()
+        return kept
+
+    # Convenience entry point for an (N, 2) float array
+    def compute_hull_array(self, points):
+        points = np.asarray(points, dtype=np.float64)
+        return self.compute_hull(points[:, 0], points[:, 1])
@@ -0,0 +1,120 @@
+import os
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+from ConvexHullSolver import ConvexHullSolver
+from Hull import Hull
+
+# Divide and conquer across processes. The x-sorted points are split into K
+# contiguous slabs, each slab's hull is computed in a worker process, and the
+# K partial hulls are merged pairwise with ConvexHullSolver.combine_hulls.
+# Coordinates and the presort permutation travel through one shared memory
+# block (xs and ys as doubles, then the permutation as 64-bit ints), so workers
+# receive a name and a permutation range instead of pickled point lists, and
+# send back only their hull ring.
+#
+# With a HullProgress the solve checks in while waiting for the slabs and after
+# every pairwise merge, so it can be cancelled. Once the budget runs out no more
+# slabs are waited for: the finished ones from the left are merged, which like
+# compute_ring gives the hull of the leftmost covered points.
+
+# Below this many points per slab the pool costs more than it saves
+MIN_SLAB_SIZE = 50000
+
+
+# Runs in the worker: attach to the shared block and hull one permutation range of it
+def slab_ring(name, points, n, start, stop):
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        coordinates = block.buf[:16 * points].cast('d')
+        order = block.buf[16 * points:16 * points + 8 * n].cast('q')
+        xs, ys = coordinates[:points], coordinates[points:]
+        try:
+            return ConvexHullSolver().compute_ring(xs, ys, order, start, stop)
+        finally:
+            xs.release()
+            ys.release()
+            coordinates.release()
+            order.release()
+    finally:
+        block.close()
+
+
+class ParallelHullSolver(ConvexHullSolver):
+
+    def __init__(self, workers=None, slabs=None, presort=None, profiler=None, progress=None):
+        ConvexHullSolver.__init__(self, presort, profiler, progress)
+        self.workers = workers or os.cpu_count() or 1
+        self.slabs = slabs or self.workers
+
+    # O(n log n / K) per worker + O(h log K) to merge
+    def compute_hull(self, xs, ys, order=None, observer=None):  # returns hull
+        if order is None:
+            order = self.sort_points_by_x(xs, ys)
+        points, n = len(xs), len(order)
+        slabs = max(1, min(self.slabs, n // MIN_SLAB_SIZE))
+        if slabs == 1:
+            return ConvexHullSolver.compute_hull(self, xs, ys, order, observer)
+        progress = self.progress
+
+        block = shared_memory.SharedMemory(create=True, size=16 * points + 8 * n)
+        try:
+            coordinates = block.buf[:16 * points].cast('d')
+            coordinates[:points] = array('d', xs)
+            coordinates[points:] = array('d', ys)
+            coordinates.release()
+            shared_order = block.buf[16 * points:16 * points + 8 * n].cast('q')
+            shared_order[:] = array('q', order)
+            shared_order.release()
+
+            bounds = [i * n // slabs for i in range(slabs + 1)]
+            pool = ProcessPoolExecutor(max_workers=min(self.workers, slabs))
+            hulls = []
+            try:
+                futures = [pool.submit(slab_ring, block.name, points, n, bounds[i], bounds[i + 1]) for i in range(slabs)]
+                hulls = self.slab_rings(futures, progress)
+            finally:
+                # A cancelled or cut short solve does not wait for the slabs it dropped
+                pool.shutdown(wait=len(hulls) == slabs, cancel_futures=True)
+        finally:
+            block.close()
+            block.unlink()
+        if len(hulls) < slabs:
+            progress.covered = bounds[len(hulls)]
+
+        # Merge neighbouring slabs pairwise, O(log K) rounds
+        done = slabs
+        while len(hulls) > 1:
+            merged = []
+            for i in range(0, len(hulls) - 1, 2):
+                (left_ring, left_right_most), (right_ring, right_right_most) = hulls[i], hulls[i + 1]
+                merged.append(self.combine_hulls(xs, ys, left_ring, left_right_most, right_ring, right_right_most, observer))
+                if progress is not None:
+                    done += 1
+                    progress.merged(done, 2 * slabs - 1)
+            if len(hulls) % 2:
+                merged.append(hulls[-1])
+            hulls = merged
+
+        ring, right_most_index = hulls[0]
+        return Hull(xs, ys, ring, right_most_index)
+
+    # The slab rings in order. With progress, checks in as slabs finish and at least
+    # every progress.interval; once the budget has run out, returns the finished slabs
+    # from the left as soon as there is one.
+    def slab_rings(self, futures, progress):  # returns rings
+        if progress is None:
+            return [future.result() for future in futures]
+        pending, stopped = set(futures), False
+        while pending:
+            finished, pending = wait(pending, timeout=progress.interval, return_when=FIRST_COMPLETED)
+            stopped = progress.merged(len(futures) - len(pending), 2 * len(futures) - 1) or stopped
+            if stopped and futures[0].done():
+                break
+        rings = []
+        for future in futures:
+            if not future.done():
+                break
+            rings.append(future.result())
+        return rings
@@ -0,0 +1,158 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+# Binary point files, for point sets too big to go through QPointF lists. A file
+# is a 64 byte header followed by packed coordinates, all little-endian:
+#
+#   offset  size  field
+#        0     8  magic b'CVXHULL1'
+#        8     8  count, number of points (uint64)
+#       16     1  dtype of the coordinates, b'd' (float64) or b'f' (float32)
+#       17     1  flags, bit 0 set if an index block follows the coordinates
+#       18     6  reserved, zero
+#       24    32  bounds: min x, min y, max x, max y (float64)
+#       56     8  right_most_index of a hull result, zero for plain point sets (uint64)
+#       64        count x coordinates, then count y coordinates
+#                 count vertex indices (int64), only if flag bit 0 is set
+#
+# Keeping the x and y blocks apart lets the loader hand each one out as a flat
+# memoryview of the mapped file, so opening a file is O(1) whatever its size and
+# creates no per-point objects; pages are read in as the solver touches them.
+# Hull results written by write_hull use the same layout: the hull vertices in
+# clockwise order from the leftmost one, plus the index block holding each
+# vertex's index in the input point set.
+
+MAGIC = b'CVXHULL1'
+HEADER = struct.Struct('<8sQcB6x4dQ')
+HAS_INDICES = 1
+
+DTYPES = {b'd': 8, b'f': 4}
+
+
+# O(n): (min x, min y, max x, max y) of the coordinates, zeros if there are none
+def bounds(xs, ys):
+    if not len(xs):
+        return 0.0, 0.0, 0.0, 0.0
+    return float(min(xs)), float(min(ys)), float(max(xs)), float(max(ys))
+
+
+# O(n): the coordinates as little-endian bytes of the given array type
+def coordinate_block(values, dtype):
+    block = array(dtype, values)
+    if sys.byteorder != 'little':
+        block.byteswap()
+    return block
+
+
+# O(n): writes xs, ys as a point file; dtype 'f' halves the size at float32 precision
+def write_points(path, xs, ys, dtype='d', indices=None, right_most_index=0):
+    if len(xs) != len(ys):
+        raise Exception('Point file needs as many y coordinates as x coordinates, got {} and {}'.format(len(xs), len(ys)))
+    if dtype.encode() not in DTYPES:
+        raise Exception('Unsupported point file dtype: {}'.format(dtype))
+
+    flags = HAS_INDICES if indices is not None else 0
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(xs), dtype.encode(), flags, *bounds(xs, ys), right_most_index))
+        coordinate_block(xs, dtype).tofile(f)
+        coordinate_block(ys, dtype).tofile(f)
+        if indices is not None:
+            coordinate_block(indices, 'q').tofile(f)
+    os.replace(temporary, path)
+
+
+# O(h): writes the vertices of hull as a point file, with their input indices
+def write_hull(path, hull, dtype='d'):
+    vertices = hull.getVertices()
+    xs, ys = hull.xs, hull.ys
+    write_points(path, [xs[i] for i in vertices], [ys[i] for i in vertices], dtype, vertices, hull.right_most_index)
+
+
+class PointFile:
+
+    # O(1): maps the file and checks its header; the coordinates are not read. With
+    # data instead of a path, the same views are taken over that bytes-like object.
+    def __init__(self, path=None, data=None):
+        self.path = path if path is not None else '<buffer>'
+        self.map = None
+        if data is None:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < HEADER.size:
+                    raise Exception('{} is too short to be a point file'.format(path))
+                self.map = data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = memoryview(data)
+        self.views = [data]
+        try:
+            self.parse(data)
+        except Exception:
+            self.close()
+            raise
+
+    def parse(self, data):
+        path, size = self.path, len(data)
+        if size < HEADER.size:
+            raise Exception('{} is too short to be a point file'.format(path))
+        magic, self.count, dtype, self.flags, min_x, min_y, max_x, max_y, self.right_most_index = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise Exception('{} is not a point file (bad magic {!r})'.format(path, magic))
+        if dtype not in DTYPES:
+            raise Exception('{} has unsupported dtype {!r}'.format(path, dtype))
+        self.dtype = dtype.decode()
+        self.bounds = (min_x, min_y, max_x, max_y)
+
+        itemsize = DTYPES[dtype]
+        end = HEADER.size + 2 * itemsize * self.count + (8 * self.count if self.flags & HAS_INDICES else 0)
+        if size < end:
+            raise Exception('{} is truncated: {} points need {} bytes, the file has {}'.format(path, self.count, end, size))
+
+        # Zero-copy views of the coordinate blocks (copies on big-endian machines only)
+        xs_start, ys_start = HEADER.size, HEADER.size + itemsize * self.count
+        self.xs = self.block(data, xs_start, ys_start, self.dtype)
+        self.ys = self.block(data, ys_start, ys_start + itemsize * self.count, self.dtype)
+        self.indices = None
+        if self.flags & HAS_INDICES:
+            indices_start = ys_start + itemsize * self.count
+            self.indices = self.block(data, indices_start, indices_start + 8 * self.count, 'q')
+
+    def block(self, data, start, stop, dtype):
+        view = data[start:stop]
+        self.views.append(view)
+        if sys.byteorder == 'little':
+            view = view.cast(dtype)
+            self.views.append(view)
+            return view
+        values = array(dtype)
+        values.frombytes(view)
+        values.byteswap()
+        return values
+
+    def __len__(self):
+        return self.count
+
+    # The views must not be used after this. Arrays a consumer built over them without
+    # copying (NumpyHullSolver does) pin the map; it is then left for the mmap object to
+    # unmap once the last of them is gone, instead of failing with the file half closed.
+    def close(self):
+        for view in reversed(self.views):
+            try:
+                view.release()
+            except BufferError:
+                pass
+        self.views = []
+        self.xs = self.ys = self.indices = None
+        if self.map is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                pass
+            self.map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,11 +1,14 @@
 #!/usr/local/bin/python3.7
 
 import math
-import random
 import signal
 import sys
 import time
 
+try:
+	import numpy as np
+except ImportError:
+	np = None
 
 from which_pyqt import PYQT_VER
 if PYQT_VER == 'PYQT5':
@@ -25,10 +28,21 @@ else:
 
 # Import the code with the actual implementation
 from convex_hull import *
+from EventLog import edge_points
+from point_generator import generate
 
-PAUSE = 0.25
+# Point colors with more points than this are drawn as single pixels instead of dots
+ELLIPSE_LIMIT = 20000
+
+# Show Recursion replay: default speed in recursion steps per second, and the
+# repaint interval while replaying (steps due in between are drawn together)
+REPLAY_RATE = 4
+REPLAY_FRAME_MS = 33
 
 class PointLineView( QWidget ):
+	# current step, oldest retained step and steps recorded so far of the replayed log
+	replay_progress = pyqtSignal(int, int, int)
+
 	def __init__( self, status_bar ):
 		super(QWidget,self).__init__()
 		self.setMinimumSize(600,400)
@@ -36,6 +50,18 @@ class PointLineView( QWidget ):
 		self.pointList  = {}
 		self.lineList   = {}
 		self.status_bar = status_bar
+		self.point_layer = None		# cached image of pointList, see renderPoints
+
+		# Show Recursion replay of an EventLog, drawn from replay_edges
+		self.replay_log    = None
+		self.replay_points = None
+		self.replay_edges  = set()
+		self.replay_step   = 0
+		self.replay_recording = False	# the solver may still add steps
+		self.replay_rate   = REPLAY_RATE
+		self.replay_origin = (0.0, 0)	# (time, step) the replay clock counts from
+		self.replay_timer  = QTimer(self)
+		self.replay_timer.timeout.connect(self.replayFrame)
 
 	def displayStatusText(self, text):
 		self.status_bar.showMessage(text)
@@ -44,39 +70,82 @@ class PointLineView( QWidget ):
 	def clearPoints(self):
 		#print('POINTS CLEARED!')
 		self.pointList = {}
+		self.point_layer = None
 
 	def clearLines(self, lines=None):
 		if(not lines):
 			self.lineList = {}
+			self.stopReplay()
 		else:
+			# One pass per color instead of a list.remove per erased line
+			erased = {(line.x1(), line.y1(), line.x2(), line.y2()) for line in lines}
 			for color in self.lineList:
-				for line in lines:
-					try:
-						self.lineList[color].remove(line)
-					except:
-						pass	
-		self.repaint()
-		#time.sleep(PAUSE)
+				self.lineList[color] = [line for line in self.lineList[color] if (line.x1(), line.y1(), line.x2(), line.y2()) not in erased]
+		self.update()
 
 	def addPoints( self, point_list, color ):
 		if color in self.pointList:
 			self.pointList[color].extend( point_list )
 		else:
 			self.pointList[color] = point_list
+		self.point_layer = None
 
 	def addLines( self, line_list, color ):
 		if color in self.lineList:
 			self.lineList[color].extend( line_list )
 		else:
 			self.lineList[color] = line_list
-		self.repaint()
-		time.sleep(PAUSE)
-
-	def paintEvent(self, event):						  
-		#print('Paint!!!')
-		painter = QPainter(self)
-		painter.setRenderHint(QPainter.Antialiasing,True)
-
+		self.update()
+
+	# Replays log over points from its first step, while the solver may still be recording
+	def startReplay(self, log, points):
+		self.replay_log    = log
+		self.replay_points = points
+		self.replay_edges  = set()
+		self.replay_step   = -1
+		self.replay_recording = True
+		self.seekReplay(0)
+
+	# The solver has recorded its last step
+	def finishReplay(self):
+		self.replay_recording = False
+
+	def stopReplay(self):
+		self.replay_timer.stop()
+		self.replay_log   = None
+		self.replay_edges = set()
+
+	def setReplayRate(self, rate):
+		self.replay_rate   = rate
+		self.replay_origin = (time.time(), self.replay_step)
+
+	# Jumps to a step (scrubbing) and plays on from there
+	def seekReplay(self, step):
+		if self.replay_log is None:
+			return
+		self.moveReplay(step)
+		self.replay_origin = (time.time(), self.replay_step)
+		self.replay_timer.start(REPLAY_FRAME_MS)
+
+	# Applies every step that fell due since the last frame, then repaints once
+	def replayFrame(self):
+		log = self.replay_log
+		if log is None:
+			self.replay_timer.stop()
+			return
+		start_time, start_step = self.replay_origin
+		self.moveReplay(start_step + int((time.time() - start_time) * self.replay_rate))
+		if self.replay_step == len(log) and not self.replay_recording:
+			self.replay_timer.stop()
+
+	def moveReplay(self, step):
+		log = self.replay_log
+		self.replay_step = log.seek(self.replay_edges, self.replay_step, step)
+		self.replay_progress.emit(self.replay_step, log.first, len(log))
+		self.update()
+
+	# View units per data unit in x and y, keeping a 1.5 aspect ratio
+	def viewScale(self):
 		w = self.width() / 2.0
 		h = self.height() / 2.0
 		w2h_desired_ratio = 1.5
@@ -84,25 +153,103 @@ class PointLineView( QWidget ):
 			h = w / w2h_desired_ratio
 		else:
 			w = h * w2h_desired_ratio
+		return w, h
+
+	def paintEvent(self, event):						  
+		#print('Paint!!!')
+		painter = QPainter(self)
+		painter.setRenderHint(QPainter.Antialiasing,True)
+
+		w, h = self.viewScale()
 
+		# Lines are scaled by the transform rather than copied per repaint; a pen of
+		# width 0 is cosmetic, so it stays one pixel wide whatever the scale
 		tform = QTransform()
 		tform.translate(self.width()/2.0,self.height()/2.0)
-		tform.scale(1.0,-1.0)
+		tform.scale(w,-h)
 		painter.setTransform(tform)
 
 		for color in self.lineList:
-			c = QColor(color[0],color[1],color[2])
-			painter.setPen( c )
-			for line in self.lineList[color]:
-				ln = QLineF( w*line.x1(), h*line.y1(), w*line.x2(), h*line.y2() )
-				painter.drawLine( ln )
+			painter.setPen( QPen(QColor(color[0],color[1],color[2]), 0) )
+			painter.drawLines( self.lineList[color] )
+
+		if self.replay_edges:
+			points = self.replay_points
+			painter.setPen( QPen(QColor(255,0,0), 0) )
+			lines = []
+			for edge in self.replay_edges:
+				i, j = edge_points(edge)
+				lines.append( QLineF( points[i], points[j] ) )
+			painter.drawLines( lines )
+
+		# Points only change on Generate, so they are drawn once into an image
+		painter.resetTransform()
+		if self.point_layer is None or self.point_layer.size() != self.size():
+			self.point_layer = self.renderPoints(w, h)
+		painter.drawImage(0, 0, self.point_layer)
+
+	# Draws every point color into a transparent image of the view's size, picking the
+	# cheapest rendering that still shows each point: antialiased dots while there are
+	# few, single pixels in one drawPoints call above ELLIPSE_LIMIT, and a density
+	# grid once there are more points than pixels
+	def renderPoints(self, w, h):
+		image = QImage(self.size(), QImage.Format_ARGB32_Premultiplied)
+		image.fill(QColor(0,0,0,0))
+		painter = QPainter(image)
+
+		tform = QTransform()
+		tform.translate(self.width()/2.0,self.height()/2.0)
+		tform.scale(1.0,-1.0)
 
 		for color in self.pointList:
 			c = QColor(color[0],color[1],color[2])
-			painter.setPen( c )
-			for point in self.pointList[color]:
-				pt = QPointF(w*point.x(), h*point.y())
-				painter.drawEllipse( pt, 1.0, 1.0)
+			points = self.pointList[color]
+			if len(points) > self.width() * self.height():
+				painter.resetTransform()
+				painter.drawImage(0, 0, self.densityImage(points, c, w, h))
+			elif len(points) > ELLIPSE_LIMIT:
+				painter.setRenderHint(QPainter.Antialiasing,False)
+				painter.setTransform(QTransform(tform).scale(w,h))
+				painter.setPen( QPen(c, 0) )
+				painter.drawPoints( QPolygonF(points) )
+			else:
+				painter.setRenderHint(QPainter.Antialiasing,True)
+				painter.setTransform(tform)
+				painter.setPen( c )
+				for point in points:
+					pt = QPointF(w*point.x(), h*point.y())
+					painter.drawEllipse( pt, 1.0, 1.0)
+
+		painter.end()
+		return image
+
+	# Counts points per pixel and shades each pixel by the log of its count, O(n) plus
+	# O(pixels), vectorized when NumPy is available
+	def densityImage(self, points, c, w, h):
+		width, height = self.width(), self.height()
+		if np is not None:
+			xs = np.fromiter((point.x() for point in points), np.float64, len(points))
+			ys = np.fromiter((point.y() for point in points), np.float64, len(points))
+			cols = np.floor(width/2.0 + w*xs).astype(np.int64)
+			rows = np.floor(height/2.0 - h*ys).astype(np.int64)
+			inside = (cols >= 0) & (cols < width) & (rows >= 0) & (rows < height)
+			counts = np.bincount(rows[inside]*width + cols[inside], minlength=width*height)
+			alpha = (255 * np.log1p(counts) / np.log1p(max(counts.max(), 1))).astype(np.uint32)
+			pixels = alpha << 24 | np.uint32(c.red() << 16 | c.green() << 8 | c.blue())
+			pixels[alpha == 0] = 0
+			return QImage(pixels.tobytes(), width, height, QImage.Format_ARGB32).copy()
+
+		counts = {}
+		for point in points:
+			pixel = (math.floor(width/2.0 + w*point.x()), math.floor(height/2.0 - h*point.y()))
+			counts[pixel] = counts.get(pixel, 0) + 1
+		image = QImage(width, height, QImage.Format_ARGB32)
+		image.fill(QColor(0,0,0,0))
+		top = math.log1p(max(counts.values(), default=1))
+		for (col, row), count in counts.items():
+			if 0 <= col < width and 0 <= row < height:
+				image.setPixel(col, row, QColor(c.red(), c.green(), c.blue(), int(255 * math.log1p(count) / top)).rgba())
+		return image
 
 
 
@@ -112,6 +259,8 @@ class Proj2GUI( QMainWindow ):
 		super(Proj2GUI,self).__init__()
 
 		self.points = None								
+		self.solver_thread = None
+		self.retired_threads = []
 		self.initUI()									
        
 	def newPoints(self):
@@ -119,48 +268,22 @@ class Proj2GUI( QMainWindow ):
 		# TODO - ERROR CHECKING!!!!
 		if self.randBySeed.isChecked():
 			seed = int(self.randSeed.text())
-			random.seed( seed )
 		else: # do by time
-			random.seed( time.time() )
+			seed = None
 
-		ptlist = []
-		unique_xvals = {}
-		max_r  = 0.98
-		WIDTH  = 1.0
-		HEIGHT = 1.0
-		npoints = int(self.npoints.text())
 		if self.distribOval.isChecked():
-			while len(ptlist) < npoints:
-				x = random.uniform(-1.0,1.0)
-				y = random.uniform(-1.0,1.0)
-				if x**2+y**2 <= max_r**2:
-					xval = WIDTH*x
-					yval = HEIGHT*y
-					if not xval in unique_xvals:
-						ptlist.append( QPointF(xval,yval) )
-						unique_xvals[xval] = 1      # dict/map with float keys?
-		elif self.distribSphere.isChecked():		
-			while len(ptlist) < npoints:
-				x = random.uniform(-1.0,1.0)
-				y = random.uniform(-1.0,1.0)
-				z = random.uniform(-1.0,1.0)
-				if x**2 + y**2 + z**2 <= max_r**2:
-					xval = WIDTH*x
-					yval = HEIGHT*y
-					if not xval in unique_xvals:
-						ptlist.append( QPointF(xval,yval) )
-						unique_xvals[xval] = 1
-		elif self.distribGaussian.isChecked():
-			while len(ptlist) < npoints:
-				x = random.gauss(0.0,0.25)
-				y = random.gauss(0.0,0.25)
-				if x**2+y**2 <= max_r**2:
-					xval = WIDTH*x
-					yval = HEIGHT*y
-					if not xval in unique_xvals:
-						ptlist.append( QPointF(xval,yval) )
-						unique_xvals[xval] = 1
-		return ptlist
+			distribution = 'uniform'
+		elif self.distribSphere.isChecked():
+			distribution = 'spherical'
+		else:
+			distribution = 'gaussian'
+
+		# Vectorized generation (see point_generator.py); only the QPointF wrapping is per point
+		npoints = int(self.npoints.text())
+		xs, ys = generate(distribution, npoints, seed)
+		if not isinstance(xs, list):
+			xs, ys = xs.tolist(), ys.tolist()
+		return [QPointF(x, y) for x, y in zip(xs, ys)]
 
 	def clearClicked(self):
 		#print('clearClicked')
@@ -184,16 +307,55 @@ class Proj2GUI( QMainWindow ):
 	def solveClicked(self):
 		#print('solveClicked')
 		#self.solver.compute_hull(self.points)
-		solver_thread = ConvexHullSolverThread(self.points, self.showRecursion.isChecked())
+		# Threads are kept on the window until they finish: one dropped while running
+		# would be collected with its __del__ waiting on the GUI thread for the solve
+		if self.solver_thread is not None and self.solver_thread.isRunning():
+			self.solver_thread.cancel()
+			self.retired_threads.append(self.solver_thread)
+		self.solver_thread = solver_thread = ConvexHullSolverThread(self.points, self.showRecursion.isChecked(), self.algorithm.currentText(),
+			self.profile.isChecked(), self.epsilon.value() if self.preview.isChecked() else None, self.budget.value() or None)
+		solver_thread.show_progress.connect(self._solveprogress)
+		solver_thread.finished.connect(self._solvefinished)
 		solver_thread.show_hull.connect(self.view.addLines)
 		solver_thread.show_tangent.connect(self.view.addLines)
 		solver_thread.erase_hull.connect(self.view.clearLines)
 		solver_thread.erase_tangent.connect(self.view.clearLines)
 		solver_thread.display_text.connect(self.view.displayStatusText)
+		if solver_thread.log is not None:
+			self.view.clearLines()
+			self.view.startReplay(solver_thread.log, self.points)
+			solver_thread.finished.connect(self.view.finishReplay)
 		solver_thread.start()
 		self.solveButton.setEnabled(False)
+		self.cancelButton.setEnabled(True)
+		self.progressBar.setValue(0)
+		self.progressBar.show()
 													#changed all the update() to repaint()
 
+	def cancelClicked(self):
+		if self.solver_thread is not None:
+			self.solver_thread.cancel()
+		self.cancelButton.setEnabled(False)
+
+	def _solveprogress(self, fraction):
+		self.progressBar.setValue(int(fraction * self.progressBar.maximum()))
+
+	def _solvefinished(self):
+		if self.sender() in self.retired_threads:
+			self.retired_threads.remove(self.sender())
+			return
+		self.progressBar.hide()
+		self.cancelButton.setEnabled(False)
+		# A cancelled or budget limited solve can be run again
+		progress = self.solver_thread.progress
+		if progress.cancelled or progress.covered is not None:
+			self.solveButton.setEnabled(True)
+
+	def _replayprogress(self, step, first, total):
+		if not self.replayPosition.isSliderDown():
+			self.replayPosition.setRange(first, total)
+			self.replayPosition.setValue(step)
+
 	def _randbytime(self):
 		self.randSeed.setEnabled(False)
 	
@@ -216,6 +378,8 @@ class Proj2GUI( QMainWindow ):
 		self.npoints        = QLineEdit('10')
 		self.generateButton = QPushButton('Generate')
 		self.solveButton    = QPushButton('Solve')
+		self.cancelButton   = QPushButton('Cancel')
+		self.cancelButton.setEnabled(False)
 		self.clearButton    = QPushButton('Clear To Points')
 		self.distribOval    = QRadioButton('Uniform')
 		self.distribSphere  = QRadioButton('Spherical')
@@ -226,6 +390,32 @@ class Proj2GUI( QMainWindow ):
 		self.randSeed       = QLineEdit('0')
 
 		self.showRecursion	= QCheckBox('Show Recursion')
+		self.profile		= QCheckBox('Profile')
+		self.algorithm		= QComboBox()
+		self.algorithm.addItems(list(SOLVERS))
+		self.preview		= QCheckBox('Preview')
+		self.epsilon		= QDoubleSpinBox()
+		self.epsilon.setDecimals(4)
+		self.epsilon.setRange(0.0001, 1.0)
+		self.epsilon.setSingleStep(0.001)
+		self.epsilon.setValue(0.01)
+		self.epsilon.setPrefix('ε ')
+		self.budget			= QDoubleSpinBox()
+		self.budget.setRange(0.0, 3600.0)
+		self.budget.setSingleStep(0.5)
+		self.budget.setSuffix(' s')
+		self.budget.setSpecialValueText('No time budget')
+		self.progressBar	= QProgressBar()
+		self.progressBar.setRange(0, 1000)
+		self.progressBar.setTextVisible(False)
+		self.progressBar.hide()
+		self.statusBar.addPermanentWidget(self.progressBar)
+		self.replayRate		= QSpinBox()
+		self.replayRate.setRange(1, 1000000)
+		self.replayRate.setValue(REPLAY_RATE)
+		self.replayRate.setSuffix(' steps/s')
+		self.replayPosition	= QSlider(Qt.Horizontal)
+		self.replayPosition.setRange(0, 0)
 
 		h = QHBoxLayout()
 		h.addWidget( self.view )
@@ -236,6 +426,7 @@ class Proj2GUI( QMainWindow ):
 		h.addWidget( self.npoints )
 		h.addWidget( self.generateButton )
 		h.addWidget( self.solveButton )
+		h.addWidget( self.cancelButton )
 		h.addWidget( self.clearButton )
 		h.addStretch(1)
 		vbox.addLayout(h)
@@ -261,12 +452,27 @@ class Proj2GUI( QMainWindow ):
 		h.addWidget( self.randBySeed )
 		h.addWidget( self.randSeed )
 		h.addStretch(1)
+		h.addWidget(self.algorithm)
 		h.addWidget(self.showRecursion)
+		h.addWidget(self.profile)
+		h.addWidget(self.preview)
+		h.addWidget(self.epsilon)
+		h.addWidget(self.budget)
+		vbox.addLayout(h)
+
+		h = QHBoxLayout()
+		h.addWidget( QLabel( 'Recursion replay: ' ) )
+		h.addWidget( self.replayPosition, 1 )
+		h.addWidget( self.replayRate )
 		vbox.addLayout(h)
 
 		self.generateButton.clicked.connect(self.generateClicked)
 		self.solveButton.clicked.connect(self.solveClicked)
+		self.cancelButton.clicked.connect(self.cancelClicked)
 		self.clearButton.clicked.connect(self.clearClicked)
+		self.replayRate.valueChanged.connect(self.view.setReplayRate)
+		self.replayPosition.sliderMoved.connect(self.view.seekReplay)
+		self.view.replay_progress.connect(self._replayprogress)
 
 		self.randByTime.clicked.connect(self._randbytime)
 		self.randBySeed.clicked.connect(self._randbyseed)
@@ -0,0 +1,77 @@
+from array import array
+
+from ConvexHullSolver import ConvexHullSolver
+from Hull import Hull
+from PointFile import PointFile
+
+# Out-of-core hull over point sets that never fit in memory at once. Points are
+# read in fixed-size chunks, each chunk is hulled on its own, and its hull is
+# folded into a running hull by re-solving the union of the two vertex rings.
+# Only the running hull and one chunk are ever held, so peak memory is
+# O(h + chunk size) rather than O(n).
+
+# Points per chunk when reading files
+CHUNK_SIZE = 1 << 20
+
+
+# Yields (xs, ys) pairs of at most chunk_size points from a point file (see
+# PointFile.py), as slices of its mapped coordinate views; no chunk is copied
+def read_point_file(path, chunk_size=CHUNK_SIZE):
+    with PointFile(path) as points:
+        for start in range(0, len(points), chunk_size):
+            yield points.xs[start:start + chunk_size], points.ys[start:start + chunk_size]
+
+
+# Yields (xs, ys) array('d') pairs of at most chunk_size points from a headerless
+# file of packed x, y doubles in native byte order, as other tools dump them. This
+# raw format is separate from PointFile's, which compute_hull_file reads.
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    with open(path, 'rb') as f:
+        while True:
+            chunk = array('d')
+            try:
+                chunk.fromfile(f, 2 * chunk_size)
+            except EOFError:
+                pass    # short final chunk, fromfile keeps what it read
+            if len(chunk) % 2:
+                chunk.pop()     # torn trailing point
+            if not chunk:
+                return
+            yield chunk[0::2], chunk[1::2]
+
+
+class StreamingHullSolver:
+
+    def __init__(self, solver=None):
+        self.solver = solver or ConvexHullSolver()
+        self.xs = []
+        self.ys = []
+
+    # O(c log c) for the chunk + O(h log h) for the fold
+    def add_chunk(self, xs, ys):
+        if len(xs) == 0:
+            return
+        chunk_points = self.solver.compute_hull(xs, ys).getPoints()
+
+        # Both rings are convex, so the hull of their vertices is the hull of everything seen so far
+        xs = self.xs + [x for x, y in chunk_points]
+        ys = self.ys + [y for x, y in chunk_points]
+        points = self.solver.compute_hull(xs, ys).getPoints()
+        self.xs = [x for x, y in points]
+        self.ys = [y for x, y in points]
+
+    # Folds every (xs, ys) chunk from an iterable, e.g. read_chunks(path) for a raw file
+    def add_chunks(self, chunks):
+        for xs, ys in chunks:
+            self.add_chunk(xs, ys)
+        return self.hull()
+
+    # Running hull as a clockwise ring starting at the leftmost point
+    def hull(self):
+        n = len(self.xs)
+        right_most_index = max(range(n), key=self.xs.__getitem__) if n else 0
+        return Hull(self.xs, self.ys, list(range(n)), right_most_index)
+
+    # Hull of a point file written by PointFile.write_points
+    def compute_hull_file(self, path, chunk_size=CHUNK_SIZE):
+        return self.add_chunks(read_point_file(path, chunk_size))
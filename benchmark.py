@@ -0,0 +1,298 @@
+#!/usr/bin/python3
+# Headless benchmark of every hull engine, replacing the timings that used to be
+# copied by hand from GUI runs into ConvexHullResults.txt. For each engine,
+# distribution and n it times the presort and the hull separately, like
+# ConvexHullSolverThread.run reports them, optionally measures peak memory, and
+# fits the empirical exponent of hull time against n. Results can be written as
+# JSON and compared against a stored baseline to catch regressions.
+#
+#   python3 benchmark.py                               # 10 .. 100000 points
+#   python3 benchmark.py --max-n 10000000 --memory --json baseline.json
+#   python3 benchmark.py --baseline baseline.json      # exits 1 on a regression
+#   python3 benchmark.py --file points.bin             # a point file, see PointFile.py
+#   python3 benchmark.py --batch 50 --sizes 500000     # 10000 hulls of 50 points, batched vs looped
+#   python3 benchmark.py --window 10000 --sizes 1000   # 1000 ticks of a sliding window, dynamic vs rebuilt
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from BatchHullSolver import BatchHullSolver
+from ConvexHullSolver import ConvexHullSolver
+from DynamicHull import DynamicHull
+from PointFile import PointFile
+from point_generator import DISTRIBUTIONS, generate
+from solvers import SOLVERS
+
+# Runs quicker than these are too noisy for the exponent fit and the baseline comparison
+MIN_FIT_SECONDS = 0.001
+MIN_COMPARE_SECONDS = 0.01
+
+# A run slower than its baseline by more than this factor is a regression
+DEFAULT_TOLERANCE = 1.25
+
+
+# Returns (sort seconds, hull seconds, hull size)
+def time_run(solver, xs, ys):
+    t1 = time.perf_counter()
+    order = solver.sort_points_by_x(xs, ys)
+    t2 = time.perf_counter()
+    hull = solver.compute_hull(xs, ys, order)
+    t3 = time.perf_counter()
+    return t2 - t1, t3 - t2, len(hull)
+
+
+# Peak bytes allocated by Python (and NumPy) during one sort and hull. Tracing slows
+# allocation down a lot, so this is a separate run from the timed ones. Memory
+# used inside worker processes is not seen.
+def peak_memory(solver, xs, ys):
+    tracemalloc.start()
+    try:
+        solver.compute_hull(xs, ys, solver.sort_points_by_x(xs, ys))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# Least squares slope of log(seconds) against log(n), i.e. the k in t ~ c * n^k
+def fit_exponent(sizes, seconds):
+    points = [(math.log(n), math.log(t)) for n, t in zip(sizes, seconds) if t >= MIN_FIT_SECONDS]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, y in points) / len(points)
+    mean_y = sum(y for x, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, y in points)
+    if spread == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+HEADER_FORMAT = '{:<28} {:<10} {:>9} {:>10} {:>10} {:>14} {:>6} {:>10}'
+ROW_FORMAT = '{:<28} {:<10} {:>9} {:>10.4f} {:>10.4f} {:>14.3e} {:>6} {:>10}'
+
+
+# Times every engine on the same point sets: lists for most engines, arrays for vectorized ones
+def run_engines(engines, distribution, n, arrays, lists, memory):
+    results = []
+    for engine in engines:
+        point_sets = arrays if SOLVERS[engine].vectorized else lists
+        runs = [time_run(SOLVERS[engine](), xs, ys) for xs, ys in point_sets]
+        result = {
+            'engine': engine,
+            'distribution': distribution,
+            'n': n,
+            'sort_sec': min(r[0] for r in runs),
+            'hull_sec': min(r[1] for r in runs),
+            'hull_mean_sec': sum(r[1] for r in runs) / len(runs),
+            'hull_size': runs[0][2],
+            'peak_bytes': peak_memory(SOLVERS[engine](), *point_sets[0]) if memory else None,
+        }
+        results.append(result)
+        print(ROW_FORMAT.format(
+            engine, distribution, n, result['sort_sec'], result['hull_sec'],
+            result['hull_sec'] / (n * math.log2(max(n, 2))), result['hull_size'],
+            '' if result['peak_bytes'] is None else '{:.1f}'.format(result['peak_bytes'] / 2**20)))
+        sys.stdout.flush()
+    return results
+
+
+def run(engines, distributions, sizes, repeat, seed, memory):
+    results = []
+    print(HEADER_FORMAT.format('engine', 'points', 'n', 'sort sec', 'hull sec', 'hull/(n log n)', 'h', 'peak MB'))
+    for distribution in distributions:
+        for n in sizes:
+            # Every engine sees the same point sets, as lists like the GUI passes,
+            # except for vectorized engines which get the generated arrays
+            arrays = [generate(distribution, n, seed + r) for r in range(repeat)]
+            lists = [(xs, ys) if isinstance(xs, list) else (xs.tolist(), ys.tolist()) for xs, ys in arrays]
+            results.extend(run_engines(engines, distribution, n, arrays, lists, memory))
+    return results
+
+
+# BatchHullSolver against a loop of Divide and Conquer calls on the same groups of
+# group_size points each. n is the total number of points, h the total hull size.
+def run_batches(distributions, sizes, group_size, repeat, seed):
+    results = []
+    print(HEADER_FORMAT.format('engine', 'points', 'n', 'sort sec', 'hull sec', 'hull/(n log n)', 'h', 'peak MB'))
+    for distribution in distributions:
+        for n in sizes:
+            offsets = list(range(0, n, group_size)) + [n]
+            for engine in ('Batch of {}'.format(group_size), 'Loop of {}'.format(group_size)):
+                runs = []
+                for r in range(repeat):
+                    xs, ys = generate(distribution, n, seed + r)
+                    lists = (xs, ys) if isinstance(xs, list) else (xs.tolist(), ys.tolist())
+                    t1 = time.perf_counter()
+                    if engine.startswith('Batch'):
+                        hull_size = len(BatchHullSolver().compute_hulls(xs, ys, offsets)[0])
+                    else:
+                        solver = ConvexHullSolver()
+                        hull_size = sum(len(solver.compute_hull(lists[0][start:stop], lists[1][start:stop]))
+                                        for start, stop in zip(offsets, offsets[1:]))
+                    runs.append(time.perf_counter() - t1)
+                result = {
+                    'engine': engine, 'distribution': distribution, 'n': n, 'sort_sec': 0.0,
+                    'hull_sec': min(runs), 'hull_mean_sec': sum(runs) / len(runs), 'hull_size': hull_size, 'peak_bytes': None,
+                }
+                results.append(result)
+                print(ROW_FORMAT.format(engine, distribution, n, 0.0, result['hull_sec'],
+                                        result['hull_sec'] / (n * math.log2(max(n, 2))), hull_size, ''))
+                sys.stdout.flush()
+    return results
+
+
+# DynamicHull against a compute_hull rebuild on a sliding window of window points. The
+# window starts full, untimed; each of the n ticks then adds the next point, expires the
+# oldest and asks for a point of the hull (the rebuild gets the whole hull anyway).
+def run_windows(distributions, sizes, window, repeat, seed):
+    results = []
+    print(HEADER_FORMAT.format('engine', 'points', 'n', 'sort sec', 'hull sec', 'hull/(n log n)', 'h', 'peak MB'))
+    for distribution in distributions:
+        for n in sizes:
+            for engine in ('Dynamic window {}'.format(window), 'Rebuild window {}'.format(window)):
+                runs = []
+                for r in range(repeat):
+                    xs, ys = generate(distribution, window + n, seed + r)
+                    if not isinstance(xs, list):
+                        xs, ys = xs.tolist(), ys.tolist()
+                    if engine.startswith('Dynamic'):
+                        hull = DynamicHull(xs[:window], ys[:window])
+                        t1 = time.perf_counter()
+                        for tick in range(n):
+                            hull.insert(xs[window + tick], ys[window + tick])
+                            hull.delete(xs[tick], ys[tick])
+                            hull.extreme(1.0, 0.0)
+                        runs.append(time.perf_counter() - t1)
+                        hull_size = len(hull.hull())
+                    else:
+                        # The window as a ring buffer, so a tick costs the rebuild and not a copy
+                        solver, window_xs, window_ys = ConvexHullSolver(), xs[:window], ys[:window]
+                        t1 = time.perf_counter()
+                        for tick in range(n):
+                            window_xs[tick % window], window_ys[tick % window] = xs[window + tick], ys[window + tick]
+                            hull_size = len(solver.compute_hull(window_xs, window_ys))
+                        runs.append(time.perf_counter() - t1)
+                result = {
+                    'engine': engine, 'distribution': distribution, 'n': n, 'sort_sec': 0.0,
+                    'hull_sec': min(runs), 'hull_mean_sec': sum(runs) / len(runs), 'hull_size': hull_size, 'peak_bytes': None,
+                }
+                results.append(result)
+                print(ROW_FORMAT.format(engine, distribution, n, 0.0, result['hull_sec'],
+                                        result['hull_sec'] / (n * math.log2(max(n, 2))), hull_size, ''))
+                sys.stdout.flush()
+    return results
+
+
+# Point files (see PointFile.py) are timed on their mapped views as they are, the
+# way ConvexHullSolverThread passes them, so the load itself is not a copy
+def run_files(engines, paths, repeat, memory):
+    results = []
+    print(HEADER_FORMAT.format('engine', 'file', 'n', 'sort sec', 'hull sec', 'hull/(n log n)', 'h', 'peak MB'))
+    for path in paths:
+        with PointFile(path) as points:
+            point_sets = [(points.xs, points.ys)] * repeat
+            results.extend(run_engines(engines, os.path.basename(path), len(points), point_sets, point_sets, memory))
+    return results
+
+
+def fits(results):
+    fitted = []
+    keys = list(dict.fromkeys((r['engine'], r['distribution']) for r in results))
+    for engine, distribution in keys:
+        rows = [r for r in results if r['engine'] == engine and r['distribution'] == distribution]
+        fitted.append({
+            'engine': engine,
+            'distribution': distribution,
+            'hull_exponent': fit_exponent([r['n'] for r in rows], [r['hull_sec'] for r in rows]),
+            'sort_exponent': fit_exponent([r['n'] for r in rows], [r['sort_sec'] for r in rows]),
+        })
+    return fitted
+
+
+# Returns the runs that got slower than the baseline by more than tolerance
+def regressions(results, baseline, tolerance):
+    previous = {(r['engine'], r['distribution'], r['n']): r for r in baseline['results']}
+    slower = []
+    for r in results:
+        old = previous.get((r['engine'], r['distribution'], r['n']))
+        if old is None:
+            continue
+        old_total = old['sort_sec'] + old['hull_sec']
+        total = r['sort_sec'] + r['hull_sec']
+        if old_total >= MIN_COMPARE_SECONDS and total > old_total * tolerance:
+            slower.append((r, total / old_total))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time every convex hull engine on the Proj2GUI point distributions.')
+    parser.add_argument('--engine', action='append', choices=list(SOLVERS), help='engine to run (repeatable, default all)')
+    parser.add_argument('--distribution', action='append', choices=list(DISTRIBUTIONS), help='point distribution (repeatable, default all)')
+    parser.add_argument('--file', action='append', help='time a point file written by PointFile.write_points instead of generated points (repeatable)')
+    parser.add_argument('--batch', type=int, metavar='GROUP_SIZE', help='time BatchHullSolver against a compute_hull loop on groups of this many points')
+    parser.add_argument('--window', type=int, metavar='WINDOW', help='time DynamicHull against a rebuild per tick on a sliding window of this many points, over n ticks')
+    parser.add_argument('--sizes', type=int, nargs='+', help='explicit point counts')
+    parser.add_argument('--min-n', type=int, default=10, help='smallest power of ten to run (default 10)')
+    parser.add_argument('--max-n', type=int, default=100000, help='largest power of ten to run (default 100000, up to 10000000)')
+    parser.add_argument('--repeat', type=int, default=3, help='point sets per size; the fastest run is kept (default 3)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first point set (default 0)')
+    parser.add_argument('--memory', action='store_true', help='also measure peak traced memory in a separate run')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='compare against results written earlier with --json')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='slowdown factor counted as a regression (default 1.25)')
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes
+    if not sizes:
+        sizes = [10 ** k for k in range(len(str(args.min_n)) - 1, len(str(args.max_n))) if args.min_n <= 10 ** k <= args.max_n]
+    engines = args.engine or list(SOLVERS)
+    distributions = args.distribution or list(DISTRIBUTIONS)
+
+    if args.batch:
+        results = run_batches(distributions, sizes, args.batch, args.repeat, args.seed)
+    elif args.window:
+        results = run_windows(distributions, sizes, args.window, args.repeat, args.seed)
+    elif args.file:
+        results = run_files(engines, args.file, args.repeat, args.memory)
+    else:
+        results = run(engines, distributions, sizes, args.repeat, args.seed, args.memory)
+
+    fitted = fits(results)
+    print()
+    print('{:<28} {:<10} {:>13} {:>13}'.format('engine', 'points', 'hull exponent', 'sort exponent'))
+    for f in fitted:
+        print('{:<28} {:<10} {:>13} {:>13}'.format(
+            f['engine'], f['distribution'],
+            *('-' if k is None else '{:.2f}'.format(k) for k in (f['hull_exponent'], f['sort_exponent']))))
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'results': results,
+            'fits': fitted,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        slower = regressions(results, baseline, args.tolerance)
+        print()
+        for r, ratio in slower:
+            print('REGRESSION {} {} n={}: {:.2f}x the baseline time'.format(r['engine'], r['distribution'], r['n'], ratio))
+        if slower:
+            return 1
+        print('No regressions against {}'.format(args.baseline))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,14 @@
 #!/usr/bin/python3
 # why the shebang here, when it's imported?  Can't really be used stand alone, right?  And fermat.py didn't have one...
 # this is 4-5 seconds slower on 1000000 points than Ryan's desktop...  Why?
-from ConvexHullSolver import ConvexHullSolver
+from ApproximateHullSolver import ApproximateHullSolver
+from EventLog import EventLog
+from Hull import Hull
+from HullCache import HullCache
+from HullProfiler import HullProfiler
+from HullProgress import HullCancelled, HullProgress
+from solvers import SOLVERS
 import time
-from operator import methodcaller
 
 from which_pyqt import PYQT_VER
 if PYQT_VER == 'PYQT5':
@@ -13,42 +18,127 @@ elif PYQT_VER == 'PYQT4':
 else:
 	raise Exception('Unsupported Version of PyQt: {}'.format(PYQT_VER))
 
+# Results of earlier solves, shared by every solver thread
+HULL_CACHE = HullCache()
+
+# Color of the ε-hull preview shown while the exact hull is computed
+PREVIEW_COLOR = (0, 0, 255)
 
 class ConvexHullSolverThread(QThread):
-	def __init__( self, unsorted_points, demo):
+	def __init__( self, unsorted_points, demo, algorithm='Divide and Conquer', profile=False, epsilon=None, budget=None):
 		self.points = unsorted_points					
-		self.pause = demo
+		self.profile = profile
+		# With a tolerance, an approximate hull within epsilon is shown before the exact one
+		self.epsilon = epsilon
+		# In demo mode every recursion step goes into a log the view replays at its own pace
+		self.log = EventLog() if demo else None
+		self.algorithm = algorithm
 		QThread.__init__(self)
+		# Cancellation, progress and the time budget (seconds, or None) of the solve. It reports
+		# to show_progress only during run(), so it holds no reference back to the thread
+		# and the thread is freed as soon as the GUI drops it, not by a later garbage collection.
+		self.progress = HullProgress(budget=budget)
 
 	def __del__(self):
-		self.wait()
+		self.cancel()
+		# At interpreter exit Qt may already have destroyed the thread under this wrapper
+		try:
+			self.wait()
+		except RuntimeError:
+			pass
+
+	# Safe to call from the GUI thread; the solver stops at its next merge check
+	def cancel(self):
+		self.progress.cancel()
 
 	show_hull = pyqtSignal(list, tuple)
 	display_text = pyqtSignal(str)
+	# fraction of the merges done, at most every HullProgress.REPORT_INTERVAL seconds
+	show_progress = pyqtSignal(float)
 
 # some additional thread signals you can implement and use for debugging, if you like
 	show_tangent = pyqtSignal(list, tuple)
 	erase_hull = pyqtSignal(list)
 	erase_tangent = pyqtSignal(list)
 
+	def edge_lines(self, edges):
+		xs, ys = self.xs, self.ys
+		return [QLineF(xs[i], ys[i], xs[j], ys[j]) for i, j in edges]
+
 	def run(self):
-		assert(type(self.points) == list and type(self.points[0]) == QPointF )
+		self.progress.report = self.show_progress.emit
+		try:
+			self.solve()
+		finally:
+			self.progress.report = None
+
+	def solve(self):
+		# Either QPointFs from the GUI or a loaded PointFile (anything with coordinate sequences xs, ys)
+		assert( (type(self.points) == list and type(self.points[0]) == QPointF) or hasattr(self.points, 'xs') )
 
 		n = len(self.points)
 		print( 'Computing Hull for set of {} points'.format(n) )
 
-		convexHullSolver = ConvexHullSolver()
-
-		t1 = time.time()
-		# SORT THE POINTS BY INCREASING X-VALUE
-		convexHullSolver.sort_points_by_x(self.points)
-		t2 = time.time()
-		print('Time Elapsed (Sorting): {:3.3f} sec'.format(t2-t1))
+		convexHullSolver = SOLVERS[self.algorithm]()
+		# Only the divide and conquer engines are instrumented
+		profiler = None
+		if self.profile and hasattr(convexHullSolver, 'profiler'):
+			profiler = convexHullSolver.profiler = HullProfiler()
 
-		t3 = time.time()
-		# COMPUTE THE CONVEX HULL USING DIVIDE AND CONQUER
-		complete_hull_and_points = convexHullSolver.compute_hull(self.points, self)
-		t4 = time.time()
+		if type(self.points) == list:
+			self.xs, self.ys = [point.x() for point in self.points], [point.y() for point in self.points]
+		else:
+			self.xs, self.ys = self.points.xs, self.points.ys
+
+		# Only the divide and conquer engines check in at their merges; the others can only be cancelled between stages
+		if hasattr(convexHullSolver, 'progress'):
+			convexHullSolver.progress = self.progress
+		self.progress.start()
+
+		t0 = time.time()
+		# LOOK FOR AN IDENTICAL EARLIER SOLVE (Show Recursion and profiling have to run)
+		cache_key = HULL_CACHE.key(self.xs, self.ys, self.algorithm)
+		cached = HULL_CACHE.get(cache_key) if self.log is None and profiler is None else None
+		print('Time Elapsed (Cache lookup): {:3.6f} sec'.format(time.time()-t0))
+
+		# SHOW AN APPROXIMATE HULL FIRST (not worth it for cached results or a replayed log)
+		preview = None
+		if self.epsilon is not None and cached is None and self.log is None:
+			t = time.time()
+			approximate, bound = ApproximateHullSolver(self.epsilon).approximate(self.xs, self.ys)
+			preview = self.edge_lines(approximate.getEdges())
+			self.show_hull.emit(preview, PREVIEW_COLOR)
+			self.display_text.emit('Preview within {:.4g} in {:3.3f} sec, computing the exact hull...'.format(bound, time.time()-t))
+
+		try:
+			t1 = time.time()
+			# SORT THE POINTS BY INCREASING X-VALUE (as a permutation of their indices)
+			order = convexHullSolver.sort_points_by_x(self.xs, self.ys) if cached is None and not self.progress.cancelled else None
+			t2 = time.time()
+			print('Time Elapsed (Sorting): {:3.3f} sec'.format(t2-t1))
+
+			t3 = time.time()
+			# COMPUTE THE CONVEX HULL WITH THE SELECTED ENGINE
+			if self.progress.cancelled:
+				raise HullCancelled('Hull computation cancelled before it started')
+			if cached is None:
+				hull = convexHullSolver.compute_hull(self.xs, self.ys, order, self.log.record if self.log is not None else None)
+				if self.progress.cancelled:
+					raise HullCancelled('Hull computation cancelled, result dropped')
+				if self.log:
+					# the Parallel engine logs its slab merges but not the slabs themselves
+					self.log.finish(hull.getEdges())
+				# A hull cut short by the time budget is not the hull of these points
+				if self.progress.covered is None:
+					HULL_CACHE.put(cache_key, hull.getVertices(), hull.right_most_index)
+			else:
+				hull = Hull(self.xs, self.ys, *cached)
+			t4 = time.time()
+		except HullCancelled as e:
+			text = '{} ({:3.3f} sec, {:.0%} of the merges done)'.format(e, time.time()-t0, self.progress.fraction())
+			self.display_text.emit(text)
+			print(text)
+			return
 
 		USE_DUMMY = False
 		if USE_DUMMY:
@@ -61,14 +151,23 @@ class ConvexHullSolverThread(QThread):
 			# send a signal to the GUI thread with the hull and its color
 			self.show_hull.emit(polygon,(255,0,0))
 
-		else:
+		elif not self.log:
 			# PASS THE CONVEX HULL LINES BACK TO THE GUI FOR DISPLAY
-			self.show_hull.emit(complete_hull_and_points[0].getLines(), (255, 0, 0))
+			# (engines may hand back their own copy of the coordinates; a replayed
+			# log already ends on the hull)
+			if preview is not None:
+				# before the exact hull goes up, since erasing removes matching lines of every color
+				self.erase_hull.emit(preview)
+			self.xs, self.ys = hull.xs, hull.ys
+			self.show_hull.emit(self.edge_lines(hull.getEdges()), (255, 0, 0))
 			
 		# send a signal to the GUI thread with the time used to compute the hull
-		self.display_text.emit('Time Elapsed (Convex Hull): {:3.3f} sec'.format(t4-t3))
-		print('Time Elapsed (Convex Hull): {:3.3f} sec'.format(t4-t3))
-			
-
-
-
+		text = 'Time Elapsed (Convex Hull): {:3.3f} sec{} (cache: {} hits, {} misses)'.format(
+			t4-t3, ', cached' if cached is not None else '', HULL_CACHE.hits, HULL_CACHE.misses)
+		if self.progress.covered is not None:
+			text = 'Time budget reached, partial hull of the leftmost {} of {} points | '.format(self.progress.covered, len(order)) + text
+		if profiler is not None:
+			text += ' | ' + profiler.summary()
+			print(profiler.collapsed(), end='')
+		self.display_text.emit(text)
+		print(text)
@@ -0,0 +1,124 @@
+# Seeded point generation for the distributions offered by Proj2GUI: uniform
+# over the disc of radius 0.98, a uniform ball of the same radius seen from
+# above ("spherical"), and a Gaussian cloud cut off at that radius. Used by the
+# GUI and by benchmark.py so both see the same inputs for the same seed.
+#
+# With NumPy every distribution is drawn in vectorized blocks of BLOCK_SIZE
+# candidates, by direct polar sampling where possible and by rejection
+# otherwise. Blocks are drawn the same way however the output is chunked, so
+# generate() and any chunk_size of generate_chunks() give the same points for
+# the same seed. Without NumPy the original per-point loops are used instead.
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAX_R = 0.98
+
+# Candidates drawn per vectorized block
+BLOCK_SIZE = 1 << 16
+
+# Default number of points per chunk from generate_chunks
+CHUNK_SIZE = 1 << 20
+
+
+# O(k): k points uniform in the disc, r = R sqrt(u) makes the area density constant
+def uniform_block(rng, k):
+    r = MAX_R * np.sqrt(rng.random(k))
+    theta = 2 * np.pi * rng.random(k)
+    return r * np.cos(theta), r * np.sin(theta)
+
+
+# O(k): k points uniform in the ball, projected onto the plane. r = R u^(1/3) with a
+# uniform direction on the unit sphere (z uniform in [-1, 1] by Archimedes).
+def spherical_block(rng, k):
+    r = MAX_R * np.cbrt(rng.random(k))
+    z = rng.uniform(-1.0, 1.0, k)
+    theta = 2 * np.pi * rng.random(k)
+    planar = r * np.sqrt(1 - z * z)
+    return planar * np.cos(theta), planar * np.sin(theta)
+
+
+# O(k): k Gaussian candidates, of which the ones outside the disc are rejected
+def gaussian_block(rng, k):
+    xs = rng.normal(0.0, 0.25, k)
+    ys = rng.normal(0.0, 0.25, k)
+    inside = xs * xs + ys * ys <= MAX_R * MAX_R
+    return xs[inside], ys[inside]
+
+
+BLOCKS = {'uniform': uniform_block, 'spherical': spherical_block, 'gaussian': gaussian_block}
+
+
+# Pure Python fallbacks, the loops Proj2GUI.newPoints used to run
+def uniform_point(rng):
+    while True:
+        x = rng.uniform(-1.0, 1.0)
+        y = rng.uniform(-1.0, 1.0)
+        if x**2 + y**2 <= MAX_R**2:
+            return x, y
+
+
+def spherical_point(rng):
+    while True:
+        x = rng.uniform(-1.0, 1.0)
+        y = rng.uniform(-1.0, 1.0)
+        z = rng.uniform(-1.0, 1.0)
+        if x**2 + y**2 + z**2 <= MAX_R**2:
+            return x, y
+
+
+def gaussian_point(rng):
+    while True:
+        x = rng.gauss(0.0, 0.25)
+        y = rng.gauss(0.0, 0.25)
+        if x**2 + y**2 <= MAX_R**2:
+            return x, y
+
+
+POINTS = {'uniform': uniform_point, 'spherical': spherical_point, 'gaussian': gaussian_point}
+
+DISTRIBUTIONS = list(POINTS)
+
+
+# O(npoints) memory of one chunk at a time: yields xs, ys pairs of at most chunk_size
+# points each, npoints in total. They are NumPy arrays if NumPy is available and
+# lists otherwise. seed=None draws a fresh seed from the operating system.
+def generate_chunks(distribution, npoints, seed=None, chunk_size=CHUNK_SIZE):
+    if distribution not in POINTS:
+        raise Exception('Unknown point distribution: {}'.format(distribution))
+
+    if np is None:
+        rng = random.Random(seed)
+        point = POINTS[distribution]
+        for start in range(0, npoints, chunk_size):
+            points = [point(rng) for i in range(min(chunk_size, npoints - start))]
+            yield [x for x, y in points], [y for x, y in points]
+        return
+
+    rng = np.random.default_rng(seed)
+    block = BLOCKS[distribution]
+    pending_xs, pending_ys, pending = [], [], 0
+    remaining = npoints
+    while remaining > 0:
+        # Draw whole blocks until this chunk is covered, then keep the surplus for the next one
+        size = min(chunk_size, remaining)
+        while pending < size:
+            xs, ys = block(rng, BLOCK_SIZE)
+            pending_xs.append(xs)
+            pending_ys.append(ys)
+            pending += len(xs)
+        xs, ys = np.concatenate(pending_xs), np.concatenate(pending_ys)
+        yield xs[:size], ys[:size]
+        pending_xs, pending_ys, pending = [xs[size:]], [ys[size:]], len(xs) - size
+        remaining -= size
+
+
+# O(npoints): all points at once
+def generate(distribution, npoints, seed=None):
+    chunks = list(generate_chunks(distribution, npoints, seed, max(npoints, 1)))
+    if not chunks:
+        return (np.empty(0), np.empty(0)) if np is not None else ([], [])
+    return chunks[0]
@@ -0,0 +1,91 @@
+# Orientation predicate shared by the hull engines. orient() is positive when
+# c lies to the left of the directed line a->b, negative when it lies to the
+# right and zero when the three points are collinear. The floating point
+# determinant is trusted only when it clears Shewchuk's error bound for
+# orient2d; otherwise the sign is recomputed exactly with fractions, which is
+# rare on real data but keeps near-collinear and shared-x inputs correct.
+from fractions import Fraction
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# (3 + 16 eps) eps for IEEE doubles, Shewchuk's ccwerrboundA
+ERROR_BOUND = 3.3306690738754716e-16
+
+# Smallest positive double, the magnitude orient_array gives exactly decided signs
+TINY = 2.2250738585072014e-308
+
+
+# Exact sign of the determinant as -1, 0 or 1
+def orient_exact(ax, ay, bx, by, cx, cy):
+    ax, ay = Fraction(ax), Fraction(ay)
+    det = (Fraction(bx) - ax) * (Fraction(cy) - ay) - (Fraction(by) - ay) * (Fraction(cx) - ax)
+    return (det > 0) - (det < 0)
+
+
+# Floating point filter with exact fallback. Only the sign of the result is meaningful.
+def orient(ax, ay, bx, by, cx, cy):
+    det_left = (bx - ax) * (cy - ay)
+    det_right = (by - ay) * (cx - ax)
+    det = det_left - det_right
+    if abs(det) > ERROR_BOUND * (abs(det_left) + abs(det_right)):
+        return det
+    return orient_exact(ax, ay, bx, by, cx, cy)
+
+
+# O(k): orient over NumPy arrays (any of them may be a scalar), as a float array of
+# determinants. Entries that do not clear the error bound are recomputed exactly and
+# keep their float magnitude, at least TINY, so callers looking for the largest
+# determinant can still use it; their sign is exact. Vector kernels keep meeting a
+# point against an edge it is an end of, which is settled without fractions.
+#
+# For one edge a->b against many points, span, the (width, height) of a box holding
+# all of them, gives one error bound for the whole kernel instead of one per entry,
+# which saves several passes over the arrays. It is at most twice as loose.
+def orient_array(ax, ay, bx, by, cx, cy, span=None):
+    if span is None:
+        det_left = (bx - ax) * (cy - ay)
+        det_right = (by - ay) * (cx - ax)
+        det = det_left - det_right
+        bound = ERROR_BOUND * (np.abs(det_left) + np.abs(det_right))
+    else:
+        # In place, as cx and cy are held by the caller and NumPy cannot reuse them
+        det = np.subtract(cy, ay)
+        det *= bx - ax
+        det_right = np.subtract(cx, ax)
+        det_right *= by - ay
+        det -= det_right
+        bound = 2 * ERROR_BOUND * (abs(bx - ax) * span[1] + abs(by - ay) * span[0])
+    uncertain = (np.abs(det) <= bound).nonzero()[0]
+    if len(uncertain):
+        coordinates = [c[uncertain].tolist() if isinstance(c, np.ndarray) else [c] * len(uncertain)
+                       for c in (ax, ay, bx, by, cx, cy)]
+        for i, pax, pay, pbx, pby, pcx, pcy in zip(uncertain.tolist(), *coordinates):
+            if (pcx == pax and pcy == pay) or (pcx == pbx and pcy == pby):
+                det[i] = 0.0
+            else:
+                det[i] = orient_exact(pax, pay, pbx, pby, pcx, pcy) * max(abs(det[i]), TINY)
+    return det
+
+
+# Three roundings in each orientation determinant and two more around them; 8 bounds
+# of orient2d leave a wide margin
+LINE_ERROR_BOUND = 8 * ERROR_BOUND
+
+
+# Positive when line a->b passes above line c->d at x = t, negative below and zero where
+# they cross, for ax < bx and cx < dx. It is the orientation of c->d against the point
+# of a->b at t, scaled by (bx - ax), and only its sign is meaningful like orient's.
+def line_gap(t, ax, ay, bx, by, cx, cy, dx, dy):
+    a_left, a_right = (dx - cx) * (ay - cy), (dy - cy) * (ax - cx)
+    b_left, b_right = (dx - cx) * (by - cy), (dy - cy) * (bx - cx)
+    gap = (bx - t) * (a_left - a_right) + (t - ax) * (b_left - b_right)
+    bound = abs(bx - t) * (abs(a_left) + abs(a_right)) + abs(t - ax) * (abs(b_left) + abs(b_right))
+    if abs(gap) > LINE_ERROR_BOUND * bound:
+        return gap
+    t, ax, ay, bx, by = Fraction(t), Fraction(ax), Fraction(ay), Fraction(bx), Fraction(by)
+    cx, cy, dx, dy = Fraction(cx), Fraction(cy), Fraction(dx), Fraction(dy)
+    gap = (bx - t) * ((dx - cx) * (ay - cy) - (dy - cy) * (ax - cx)) + (t - ax) * ((dx - cx) * (by - cy) - (dy - cy) * (bx - cx))
+    return (gap > 0) - (gap < 0)
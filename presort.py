@@ -0,0 +1,68 @@
+# Presort stage for the divide and conquer engines. A presort takes coordinate
+# sequences xs, ys and returns a list of point indices in increasing (x, y)
+# order with exact duplicates dropped. The merge stages walk that permutation
+# instead of reordered point objects, so the input buffers are never copied.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# O(n log n) pure Python. Sorting on x alone is much cheaper than on (x, y) tuples,
+# so the tuple sort only runs when some x value is actually shared.
+def comparison_order(xs, ys):
+    n = len(xs)
+    if len(set(xs)) == n:
+        return sorted(range(n), key=xs.__getitem__)
+
+    order = sorted(range(n), key=lambda i: (xs[i], ys[i]))
+    unique = order[:1]
+    for i in order[1:]:
+        last = unique[-1]
+        if xs[i] != xs[last] or ys[i] != ys[last]:
+            unique.append(i)
+    return unique
+
+
+# O(n) on sorted coordinate arrays: indices in order whose point differs from its predecessor
+def drop_duplicates(order, xs, ys):
+    sorted_xs, sorted_ys = xs[order], ys[order]
+    same_x = sorted_xs[1:] == sorted_xs[:-1]
+    if not same_x.any():
+        return order
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = ~same_x | (sorted_ys[1:] != sorted_ys[:-1])
+    return order[keep]
+
+
+# O(n log n) vectorized lexicographic argsort
+def argsort_order(xs, ys):
+    xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+    return drop_duplicates(np.lexsort((ys, xs)), xs, ys).tolist()
+
+
+# O(n) for points spread over [low, high], like the GUI's [-1, 1] generator. One
+# stable radix pass over 16-bit bucket numbers leaves the points sorted up to
+# their bucket, and a stable sort of that nearly sorted sequence fixes the order
+# inside buckets. The bounds only affect speed: points outside them are clamped
+# into the end buckets and still come out exactly ordered.
+def bucket_order(xs, ys, low=-1.0, high=1.0):
+    xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+    scale = 65535 / (high - low)
+    buckets = np.clip((xs - low) * scale, 0, 65535).astype(np.uint16)
+    order = np.argsort(buckets, kind='stable')
+    order = order[np.argsort(xs[order], kind='stable')]
+
+    sorted_xs = xs[order]
+    if (sorted_xs[1:] == sorted_xs[:-1]).any():
+        order = np.lexsort((ys, xs))    # shared x values also need y order
+    return drop_duplicates(order, xs, ys).tolist()
+
+
+# Presorts by name; the vectorized ones need NumPy
+PRESORTS = {'comparison': comparison_order}
+if np is not None:
+    PRESORTS['argsort'] = argsort_order
+    PRESORTS['bucket'] = bucket_order
+
+default_presort = argsort_order if np is not None else comparison_order
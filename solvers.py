@@ -0,0 +1,14 @@
+# Hull engines by the name shown in the GUI. Kept free of Qt so headless tools
+# (benchmark.py) can run the same engines as ConvexHullSolverThread.
+from ChanHullSolver import ChanHullSolver
+from ConvexHullSolver import ConvexHullSolver
+from ParallelHullSolver import ParallelHullSolver
+
+try:
+    from NumpyHullSolver import NumpyHullSolver
+except ImportError:
+    NumpyHullSolver = None
+
+SOLVERS = {'Divide and Conquer': ConvexHullSolver, 'Parallel Divide and Conquer': ParallelHullSolver, "Chan's Algorithm": ChanHullSolver}
+if NumpyHullSolver is not None:
+    SOLVERS['NumPy Quickhull'] = NumpyHullSolver
@@ -0,0 +1,84 @@
+import math
+from fractions import Fraction
+
+# Brute force references the engines are checked against: Andrew's monotone chain
+# in exact arithmetic, with the repo's ring conventions (clockwise from the lowest
+# of the leftmost points, collinear points dropped, a segment as its two ends).
+
+
+# Positive when c is left of a->b; exact, falling back to fractions near zero
+def turn(a, b, c):
+    left = (b[0] - a[0]) * (c[1] - a[1])
+    right = (b[1] - a[1]) * (c[0] - a[0])
+    if abs(left - right) > 1e-12 * (abs(left) + abs(right)):
+        return left - right
+    ax, ay = Fraction(a[0]), Fraction(a[1])
+    return (Fraction(b[0]) - ax) * (Fraction(c[1]) - ay) - (Fraction(b[1]) - ay) * (Fraction(c[0]) - ax)
+
+
+# O(n log n): the hull ring of points as (x, y) tuples
+def monotone_chain(points):
+    points = sorted(set(points))
+    if len(points) < 3:
+        return points
+
+    def chain(points):
+        stack = []
+        for p in points:
+            while len(stack) > 1 and turn(stack[-2], stack[-1], p) >= 0:
+                stack.pop()
+            stack.append(p)
+        return stack
+
+    upper, lower = chain(points), chain(points[::-1])
+    if len(upper) == 2 and len(lower) == 2:
+        return upper
+    return upper + lower[1:-1]
+
+
+# O(h): True if p is inside the ring or on its boundary
+def inside(ring, p):
+    if len(ring) == 1:
+        return ring[0] == p
+    if len(ring) == 2:
+        a, b = ring
+        return turn(a, b, p) == 0 and min(a, b) <= p <= max(a, b)
+    return all(turn(ring[i], ring[(i + 1) % len(ring)], p) <= 0 for i in range(len(ring)))
+
+
+# O(h): distance from p to the ring's boundary, 0 inside it
+def distance(ring, p):
+    if inside(ring, p):
+        return 0.0
+    best = math.inf
+    for i in range(len(ring)):
+        (ax, ay), (bx, by) = ring[i], ring[(i + 1) % len(ring)]
+        dx, dy = bx - ax, by - ay
+        t = 0.0 if dx == dy == 0 else min(max(((p[0] - ax) * dx + (p[1] - ay) * dy) / (dx * dx + dy * dy), 0.0), 1.0)
+        best = min(best, math.hypot(p[0] - ax - t * dx, p[1] - ay - t * dy))
+    return best
+
+
+# Point sets that trip up hull code: repeated grid points, every point on one line,
+# many points per x value, and points on a circle where most are vertices
+def grid(r, n):
+    return [(float(r.randint(0, 6)), float(r.randint(0, 6))) for _ in range(n)]
+
+
+def collinear(r, n):
+    return [(3.0 * t - 1, 2.0 * t + 5) for t in (float(r.randint(-20, 20)) for _ in range(n))]
+
+
+def shared_x(r, n):
+    return [(float(r.randint(0, 3)), r.uniform(-1, 1)) for _ in range(n)]
+
+
+def circle(r, n):
+    return [(float(round(50 * math.cos(a))), float(round(50 * math.sin(a)))) for a in (r.uniform(0, 2 * math.pi) for _ in range(n))]
+
+
+def gaussian(r, n):
+    return [(r.gauss(0, 1), r.gauss(0, 1)) for _ in range(n)]
+
+
+KINDS = [grid, collinear, shared_x, circle, gaussian]
@@ -0,0 +1,29 @@
+import pytest
+
+import ApproximateHullSolver as approximate
+from ApproximateHullSolver import ApproximateHullSolver
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def engine(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(approximate, 'np', None)
+    elif approximate.np is None:
+        pytest.skip('numpy is not installed')
+    return ApproximateHullSolver(0.01)
+
+
+# Every point on one vertical line leaves no x range to cut into strips
+def test_vertical_collinear(engine):
+    xs = [1.0] * 10
+    ys = [3.0, 7.0, 0.5, 9.0, 2.0, 9.0, 4.0, 0.5, 6.0, 8.0]
+    hull, width = engine.approximate(xs, ys)
+    assert width == 0.0
+    assert sorted(hull.getPoints()) == [(1.0, 0.5), (1.0, 9.0)]
+    assert sorted(engine.compute_hull(xs, ys).getPoints()) == [(1.0, 0.5), (1.0, 9.0)]
+
+
+def test_single_point(engine):
+    hull, width = engine.approximate([2.0, 2.0], [5.0, 5.0])
+    assert width == 0.0
+    assert hull.getPoints() == [(2.0, 5.0)]
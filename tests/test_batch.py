@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+import BatchHullSolver as batch
+from BatchHullSolver import BatchHullSolver
+from reference import KINDS, monotone_chain
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def solver(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(batch, 'np', None)
+    elif batch.np is None:
+        pytest.skip('numpy is not installed')
+    return BatchHullSolver()
+
+
+# Groups of every kind and size, empty ones included, in one flat buffer
+def test_groups_match_reference(solver):
+    r = random.Random(19)
+    groups = [r.choice(KINDS)(r, r.choice([0, 1, 2, 3, 5, 20, 150])) for _ in range(400)]
+    xs, ys, offsets = [], [], [0]
+    for points in groups:
+        xs.extend(x for x, y in points)
+        ys.extend(y for x, y in points)
+        offsets.append(len(xs))
+    vertices, hull_offsets, right_most_indices = solver.compute_hulls(xs, ys, offsets)
+    assert len(hull_offsets) == len(groups) + 1
+    for g, points in enumerate(groups):
+        ring = monotone_chain(points)
+        assert [(xs[i], ys[i]) for i in vertices[hull_offsets[g]:hull_offsets[g + 1]]] == ring
+        if ring:
+            assert right_most_indices[g] == ring.index(max(ring))
+
+
+def test_bad_offsets(solver):
+    with pytest.raises(Exception):
+        solver.compute_hulls([0.0, 1.0], [0.0, 1.0], [0, 1])
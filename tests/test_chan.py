@@ -0,0 +1,33 @@
+import math
+import random
+
+import pytest
+
+from ChanHullSolver import ChanHullSolver
+from ConvexHullSolver import ConvexHullSolver
+
+
+def gaussian(r, n):
+    return [r.gauss(0, 1) for _ in range(n)], [r.gauss(0, 1) for _ in range(n)]
+
+
+def circle(r, n):
+    angles = [r.uniform(0, 2 * math.pi) for _ in range(n)]
+    return [math.cos(a) for a in angles], [math.sin(a) for a in angles]
+
+
+def grid(r, n):
+    return [float(r.randint(0, 30)) for _ in range(n)], [float(r.randint(0, 30)) for _ in range(n)]
+
+
+def vertical(r, n):
+    return [1.0] * n, [r.random() for _ in range(n)]
+
+
+# The filter box drops most of a cloud, none of a circle, and repeats of grid points
+@pytest.mark.parametrize('points', [gaussian, circle, grid, vertical])
+@pytest.mark.parametrize('n', [0, 1, 2, 5, 3000, 20000])
+def test_matches_divide_and_conquer(points, n):
+    xs, ys = points(random.Random(n), n)
+    hull = ChanHullSolver().compute_hull(xs, ys)
+    assert sorted(hull.getPoints()) == sorted(ConvexHullSolver().compute_hull(xs, ys).getPoints())
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from DynamicHull import DynamicHull
+from reference import KINDS, monotone_chain
+
+
+def check(dynamic, points):
+    ring = monotone_chain(points)
+    hull = dynamic.hull()
+    assert list(zip(hull.xs, hull.ys)) == ring
+    assert len(dynamic) == len(points)
+    if points:
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-2, 1), (1, -3)):
+            x, y = dynamic.extreme(dx, dy)
+            assert (x, y) in points
+            assert dx * x + dy * y == max(dx * px + dy * py for px, py in points)
+
+
+# Random inserts and deletes, repeats included, checked after every update
+@pytest.mark.parametrize('kind', KINDS)
+def test_updates_match_reference(kind):
+    r = random.Random(kind.__name__)
+    pool = kind(r, 80)
+    points = pool[:10]
+    dynamic = DynamicHull([x for x, y in points], [y for x, y in points])
+    check(dynamic, points)
+    for step in range(600):
+        if points and r.random() < 0.45:
+            x, y = points.pop(r.randrange(len(points)))
+            dynamic.delete(x, y)
+        else:
+            x, y = r.choice(pool)
+            points.append((x, y))
+            dynamic.insert(x, y)
+        check(dynamic, points)
+
+
+def test_sliding_window():
+    r = random.Random(24)
+    points = [(r.gauss(0, 1), r.gauss(0, 1)) for _ in range(400)]
+    dynamic = DynamicHull()
+    for i, (x, y) in enumerate(points):
+        dynamic.insert(x, y)
+        if i >= 50:
+            dynamic.delete(*points[i - 50])
+        check(dynamic, points[max(0, i - 49):i + 1])
+
+
+def test_delete_missing_point():
+    dynamic = DynamicHull([0.0, 1.0], [0.0, 1.0])
+    with pytest.raises(Exception):
+        dynamic.delete(2.0, 2.0)
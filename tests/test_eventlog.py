@@ -0,0 +1,32 @@
+import random
+
+from ConvexHullSolver import ConvexHullSolver
+from EventLog import EventLog, edge_id
+
+
+def visible(log):
+    edges = set()
+    log.seek(edges, -1, len(log))
+    return edges
+
+
+def test_solver_log_ends_on_hull():
+    random.seed(1)
+    xs, ys = [random.random() for _ in range(500)], [random.random() for _ in range(500)]
+    log = EventLog()
+    hull = ConvexHullSolver().compute_hull(xs, ys, None, log.record)
+    steps = len(log)
+    log.finish(hull.getEdges())
+    assert len(log) == steps
+    assert visible(log) == set(edge_id(i, j) for i, j in hull.getEdges())
+
+
+# As the Parallel engine leaves it: a last merge that does not show the whole hull
+def test_finish_completes_short_log():
+    log = EventLog(capacity=2)
+    log.record([], [(0, 1), (1, 0)])
+    log.record([(0, 1), (1, 0)], [(0, 2)])
+    log.record([], [(2, 3)])
+    log.finish([(0, 2), (2, 4), (4, 0)])
+    assert len(log) == 4
+    assert visible(log) == {edge_id(0, 2), edge_id(2, 4), edge_id(4, 0)}
@@ -0,0 +1,23 @@
+import random
+
+import pytest
+
+from ConvexHullSolver import ConvexHullSolver
+from reference import KINDS, monotone_chain
+
+
+# Starting from a solved hull, insert the rest of the points one at a time
+@pytest.mark.parametrize('kind', KINDS)
+def test_insert_matches_reference(kind):
+    r = random.Random(kind.__name__)
+    for trial in range(25):
+        points = kind(r, r.choice([1, 2, 5, 30, 120]))
+        start = r.randint(1, len(points))
+        hull = ConvexHullSolver().compute_hull([x for x, y in points[:start]], [y for x, y in points[:start]])
+        for i in range(start, len(points)):
+            before = monotone_chain(points[:i])
+            changed = hull.insert(*points[i])
+            ring = monotone_chain(points[:i + 1])
+            assert changed == (ring != before)
+            assert hull.getPoints() == ring
+            assert hull.right_most_index == ring.index(max(ring))
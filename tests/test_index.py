@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+import HullIndex as index
+from ConvexHullSolver import ConvexHullSolver
+from HullIndex import HullIndex
+from reference import KINDS, distance, inside, monotone_chain
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def vectorized(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(index, 'np', None)
+    elif index.np is None:
+        pytest.skip('numpy is not installed')
+
+
+# Queries on the vertices, on a grid through the hull and scattered around it
+@pytest.mark.parametrize('kind', KINDS)
+def test_queries_match_reference(kind, vectorized):
+    r = random.Random(kind.__name__)
+    for trial in range(30):
+        points = kind(r, r.choice([1, 2, 3, 6, 40, 200]))
+        hull = ConvexHullSolver().compute_hull([x for x, y in points], [y for x, y in points])
+        ring = monotone_chain(points)
+        queries = points[:20] + kind(r, 40) + [(float(x), float(y)) for x in range(-2, 8) for y in range(-2, 8)]
+        queries += [(r.uniform(-60, 60), r.uniform(-60, 60)) for _ in range(40)]
+        xs, ys = [x for x, y in queries], [y for x, y in queries]
+
+        hull_index = HullIndex(hull)
+        assert len(hull_index) == len(ring)
+        assert [bool(c) for c in hull_index.contains(xs, ys)] == [inside(ring, q) for q in queries]
+        edges, distances = hull_index.nearest(xs, ys)
+        for q, edge, d in zip(queries, edges, distances):
+            assert d == pytest.approx(distance(ring, q), abs=1e-9)
+            if d > 0 and len(ring) > 1:
+                # The edge it names is at that distance
+                (ax, ay), (bx, by) = ring[edge], ring[(edge + 1) % len(ring)]
+                assert distance([(ax, ay), (bx, by)], q) == pytest.approx(d, abs=1e-9)
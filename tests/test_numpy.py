@@ -0,0 +1,34 @@
+import math
+import random
+
+import pytest
+
+from ConvexHullSolver import ConvexHullSolver
+
+numpy_solver = pytest.importorskip('NumpyHullSolver')
+
+
+def assert_same_ring(xs, ys):
+    hull = numpy_solver.NumpyHullSolver().compute_hull(xs, ys)
+    expected = ConvexHullSolver().compute_hull(xs, ys)
+    assert [(float(x), float(y)) for x, y in hull.getPoints()] == expected.getPoints()
+    assert hull.right_most_index == expected.right_most_index
+
+
+# Three points tie as farthest from (0, 0) -> (2, 2); the middle one is not a vertex
+def test_tied_farthest_points():
+    assert_same_ring([0.0, 2.0, 4.0, 2.0, 0.5, 0.25, 0.75], [0.0, 2.0, 0.0, -2.0, 1.5, 1.25, 1.75])
+
+
+def test_rounded_circle():
+    r = random.Random(2)
+    angles = [r.uniform(0, 2 * math.pi) for _ in range(500)]
+    assert_same_ring([float(round(100 * math.cos(a))) for a in angles], [float(round(100 * math.sin(a))) for a in angles])
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 20, 1000])
+def test_grid_and_line(n):
+    r = random.Random(n)
+    xs = [float(r.randint(0, 5)) for _ in range(n)]
+    assert_same_ring(xs, [float(r.randint(0, 5)) for _ in range(n)])
+    assert_same_ring(xs, [2 * x + 1 for x in xs])
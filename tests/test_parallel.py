@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+import ParallelHullSolver as parallel
+from ConvexHullSolver import ConvexHullSolver
+from HullProgress import HullCancelled, HullProgress
+from ParallelHullSolver import ParallelHullSolver
+
+
+@pytest.fixture
+def points(monkeypatch):
+    monkeypatch.setattr(parallel, 'MIN_SLAB_SIZE', 100)
+    random.seed(4)
+    return [random.gauss(0, 1) for _ in range(1000)], [random.gauss(0, 1) for _ in range(1000)]
+
+
+def test_matches_serial(points):
+    xs, ys = points
+    hull = ParallelHullSolver(workers=2, slabs=4, progress=HullProgress()).compute_hull(xs, ys)
+    assert sorted(hull.getPoints()) == sorted(ConvexHullSolver().compute_hull(xs, ys).getPoints())
+
+
+def test_cancel(points):
+    progress = HullProgress()
+    progress.cancel()
+    with pytest.raises(HullCancelled):
+        ParallelHullSolver(workers=2, slabs=4, progress=progress).compute_hull(*points)
+
+
+# With the budget already spent only the finished slabs from the left are merged
+def test_budget(points):
+    xs, ys = points
+    progress = HullProgress(budget=0.0)
+    solver = ParallelHullSolver(workers=2, slabs=4, progress=progress)
+    order = solver.sort_points_by_x(xs, ys)
+    hull = solver.compute_hull(xs, ys, order)
+    covered = progress.covered if progress.covered is not None else len(order)
+    assert covered in (250, 500, 750, 1000)
+    left = order[:covered]
+    expected = ConvexHullSolver().compute_hull([xs[i] for i in left], [ys[i] for i in left])
+    assert sorted(hull.getPoints()) == sorted(expected.getPoints())
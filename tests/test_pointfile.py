@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from ConvexHullSolver import ConvexHullSolver
+from PointFile import PointFile, write_points
+
+
+def points(n):
+    random.seed(n)
+    return [random.gauss(0, 1) for _ in range(n)], [random.gauss(0, 1) for _ in range(n)]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'points.cvx')
+    xs, ys = points(100)
+    write_points(path, xs, ys)
+    with PointFile(path) as f:
+        assert len(f) == 100
+        assert list(f.xs) == xs and list(f.ys) == ys
+    assert f.xs is None and f.map is None
+
+
+# NumpyHullSolver wraps the mapped views without copying, so its hull still holds
+# them when the file is closed
+def test_close_with_zero_copy_consumer(tmp_path):
+    numpy_solver = pytest.importorskip('NumpyHullSolver')
+    pytest.importorskip('numpy')
+    path = str(tmp_path / 'points.cvx')
+    xs, ys = points(1000)
+    write_points(path, xs, ys)
+    with PointFile(path) as f:
+        hull = numpy_solver.NumpyHullSolver().compute_hull(f.xs, f.ys)
+    assert f.views == [] and f.xs is None and f.map is None
+    assert sorted(hull.getPoints()) == sorted(ConvexHullSolver().compute_hull(xs, ys).getPoints())
@@ -0,0 +1,43 @@
+import asyncio
+import random
+import threading
+
+import pytest
+
+from ConvexHullSolver import ConvexHullSolver
+from HullServer import SMALL_GROUP, HullClient, HullServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    path = str(tmp_path / 'hull.sock')
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    hull_server = HullServer(path, workers=1)
+    asyncio.run_coroutine_threadsafe(hull_server.start(), loop).result()
+    yield path
+    asyncio.run_coroutine_threadsafe(hull_server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+# With the one worker busy on the first large request, the next small one is taken
+# alone while the large one behind it is held back for the following job
+def test_pipelined_mixed_sizes(server):
+    r = random.Random(20)
+    sizes = [3 * SMALL_GROUP, 4, 2 * SMALL_GROUP, 7, 5, 2 * SMALL_GROUP, 30]
+    requests = {}
+    with HullClient(server) as client:
+        for n in sizes:
+            xs, ys = [r.gauss(0, 1) for _ in range(n)], [r.gauss(0, 1) for _ in range(n)]
+            requests[client.submit(xs, ys, [0, n])] = xs, ys
+        for _ in sizes:
+            request_id, (vertices, hull_offsets, right_most_indices) = client.receive()
+            xs, ys = requests.pop(request_id)
+            hull = ConvexHullSolver().compute_hull(xs, ys)
+            assert list(vertices) == list(hull.getVertices())
+            assert list(hull_offsets) == [0, len(hull)]
+            assert list(right_most_indices) == [hull.right_most_index]
+    assert not requests
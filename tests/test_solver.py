@@ -0,0 +1,18 @@
+import random
+
+import pytest
+
+from ConvexHullSolver import ConvexHullSolver
+from reference import KINDS, monotone_chain
+
+
+# Large rings make the tangent walks run past WALK_STEPS into the bridge search
+@pytest.mark.parametrize('kind', KINDS)
+def test_matches_reference(kind):
+    r = random.Random(kind.__name__)
+    for trial in range(150):
+        points = kind(r, r.choice([1, 2, 3, 4, 7, 20, 100, 400]))
+        hull = ConvexHullSolver().compute_hull([x for x, y in points], [y for x, y in points])
+        ring = monotone_chain(points)
+        assert hull.getPoints() == ring
+        assert hull.right_most_index == ring.index(max(ring))
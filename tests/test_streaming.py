@@ -0,0 +1,45 @@
+import random
+from array import array
+
+import pytest
+
+from ConvexHullSolver import ConvexHullSolver
+from PointFile import PointFile, write_points
+from StreamingHullSolver import StreamingHullSolver, read_chunks
+
+
+def points(n):
+    random.seed(n)
+    return [random.gauss(0, 1) for _ in range(n)], [random.gauss(0, 1) for _ in range(n)]
+
+
+def ring(hull):
+    return hull.getPoints(), hull.right_most_index
+
+
+@pytest.mark.parametrize('dtype', ['d', 'f'])
+@pytest.mark.parametrize('chunk_size', [1, 7, 100, 1000])
+def test_point_file(tmp_path, dtype, chunk_size):
+    path = str(tmp_path / 'points.cvx')
+    xs, ys = points(500)
+    write_points(path, xs, ys, dtype)
+    # float32 files hold rounded coordinates, so the reference reads them back
+    with PointFile(path) as f:
+        xs, ys = list(f.xs), list(f.ys)
+    hull = StreamingHullSolver().compute_hull_file(path, chunk_size)
+    assert ring(hull) == ring(ConvexHullSolver().compute_hull(xs, ys))
+
+
+def test_empty_point_file(tmp_path):
+    path = str(tmp_path / 'points.cvx')
+    write_points(path, [], [])
+    assert len(StreamingHullSolver().compute_hull_file(path)) == 0
+
+
+def test_raw_chunks(tmp_path):
+    path = str(tmp_path / 'points.raw')
+    xs, ys = points(300)
+    with open(path, 'wb') as f:
+        array('d', (c for point in zip(xs, ys) for c in point)).tofile(f)
+    hull = StreamingHullSolver().add_chunks(read_chunks(path, 64))
+    assert ring(hull) == ring(ConvexHullSolver().compute_hull(xs, ys))